@@ -0,0 +1,31 @@
+"""
+softbodies
+
+2D soft body simulation
+
+The physics core (elements, solvers, world, diagnostics, presets) only depends on numpy.
+pygame is only loaded by the viewer (softbodies.render2D) and the video export (softbodies.export).
+
+Command line :
+	python -m softbodies list
+	python -m softbodies run SCENE [--steps N] [--headless]
+"""
+from .elements import (
+	Point, Spring, SpringArray, Object, SoftObject, SoftBall, SpringyBox, SpringyStructure, NetObject,
+	DYNAMIC, PINNED, KINEMATIC,
+)
+from .fields import ForceField, Gravity, Wind, Attractor, Vortex, GridField
+from .solvers import EulerSolver, XPBDSolver
+from .world import World
+from .diagnostics import Diagnostics
+from .presets import PRESETS, create_world
+
+
+def __getattr__(name : str):
+	"""DomainSolver is imported on first use : it loads multiprocessing (see domains.py)"""
+
+	if name == "DomainSolver":
+		from .domains import DomainSolver
+		return DomainSolver
+
+	raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
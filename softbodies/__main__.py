@@ -0,0 +1,222 @@
+"""
+Command line entry point
+
+python -m softbodies list : list the scenes (see presets.py)
+python -m softbodies run SCENE : open the scene in the viewer
+python -m softbodies run SCENE --steps N --headless : simulate N steps without display (no pygame import)
+python -m softbodies serve SCENE --port P : simulate without display, and stream the frames (see stream.py)
+python -m softbodies view HOST:PORT : watch a served scene, grabs are sent back to the server
+python -m softbodies run SCENE --record FILE : record the input events of the session (see session.py)
+python -m softbodies replay FILE : replay a recorded session without display, and print the phase timings
+"""
+import sys
+import argparse
+from time import perf_counter
+from typing import List
+
+from .presets import PRESETS, XMAX, YMAX, create_world
+from .solvers import XPBDSolver
+
+
+def world_options(args : argparse.Namespace) -> dict:
+
+	options = {"workers" : args.workers, "multirate" : args.multirate, "continuous_collision" : args.continuous}
+	if args.solver == "xpbd":
+		options["solver"] = XPBDSolver(args.substeps, args.iterations)
+	elif args.solver == "domains":
+		from .domains import DomainSolver  # Loads multiprocessing
+
+		options["solver"] = DomainSolver(args.processes)
+
+	return options
+
+
+# Options of the run and serve commands that are stored in a session log, to rebuild the same world
+SESSION_OPTIONS = ("solver", "substeps", "iterations", "processes", "workers", "multirate", "continuous")
+
+
+def create_render(scene : str, args : argparse.Namespace):
+	"""Viewer of a scene, with the world options of the command line"""
+
+	from .render2D import Render  # The viewer loads pygame
+
+	options = world_options(args)
+
+	fps, build = PRESETS[scene]
+	render = Render(fps, int(XMAX * 100), int(YMAX * 100), 100, options.get("solver"))
+	render.world.setWorkers(args.workers)
+	render.world.multirate = args.multirate
+	render.world.continuous_collision = args.continuous
+
+	for obj in build():
+		render.addObject(obj)
+
+	return render
+
+
+def run(args : argparse.Namespace) -> int:
+
+	if not args.headless:
+		render = create_render(args.scene, args)
+
+		if args.record:
+			from .session import SessionRecorder
+
+			header = {"scene" : args.scene, **{name : getattr(args, name) for name in SESSION_OPTIONS}}
+			render.recorder = SessionRecorder(args.record, header)
+
+		try:
+			render.start()
+		finally:
+			render.world.close()  # render.start() exits the process when the window is closed
+
+		return 0
+
+	world = create_world(args.scene, **world_options(args))
+
+	start = perf_counter()
+	for _ in range(args.steps):
+		world.step()
+	elapsed = perf_counter() - start
+
+	world.close()
+
+	print("{} : {} steps in {:.3f} s ({:.0f} steps/s)".format(args.scene, args.steps, elapsed, args.steps / max(elapsed, 1e-9)))
+
+	if args.output:
+		import numpy as np
+
+		np.savez(args.output, **{"object_" + str(i) : obj.pos for i, obj in enumerate(world.objectList)})
+
+	return 0
+
+
+def serve(args : argparse.Namespace) -> int:
+
+	from .stream import StreamServer
+
+	world = create_world(args.scene, **world_options(args))
+	server = StreamServer(world, args.host, args.port, args.quantum)
+
+	print("{} : serving on {}:{}".format(args.scene, *server.address), flush=True)
+
+	try:
+		server.run(args.frames)
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.close()
+		world.close()
+
+	return 0
+
+
+def replay(args : argparse.Namespace) -> int:
+
+	import os
+	os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Headless : no window is ever opened
+
+	from .session import Replayer, read_session
+
+	header, events = read_session(args.session)
+	render = create_render(header["scene"], argparse.Namespace(**{name : header[name] for name in SESSION_OPTIONS}))
+
+	replayer = Replayer(render, events, args.draw)
+
+	try:
+		replayer.run()
+	finally:
+		render.world.close()
+
+	print("{} : {} frames, {} events".format(header["scene"], replayer.frames, len(events)))
+	print(replayer.summary())
+
+	if args.output:
+		import numpy as np
+
+		np.savez(args.output, **replayer.timings)
+
+	return 0
+
+
+def view(args : argparse.Namespace) -> int:
+
+	from .stream import StreamClient
+
+	host, _, port = args.address.rpartition(":")
+	client = StreamClient(host or "127.0.0.1", int(port))
+
+	if not args.headless:
+		from .render2D import RemoteRender  # The viewer loads pygame
+
+		RemoteRender(client).start()
+		return 0
+
+	# Headless : receive frames and report the bandwidth
+	client.wait_topology()
+	start = perf_counter()
+
+	while (args.frames is None or client.frames < args.frames) and client.receive() is not None:
+		client.update()
+
+	elapsed = perf_counter() - start
+	client.close()
+
+	print("{} frames, {:.0f} bytes/frame, {:.0f} kB/s".format(
+		client.frames, client.received / max(client.frames, 1), client.received / max(elapsed, 1e-9) / 1000))
+
+	return 0
+
+
+def main(args : List[str]=None) -> int:
+
+	parser = argparse.ArgumentParser(prog="python -m softbodies", description="2D soft body simulation")
+	commands = parser.add_subparsers(dest="command", required=True)
+
+	commands.add_parser("list", help="list the scenes")
+
+	parser_run = commands.add_parser("run", help="run a scene")
+	parser_run.add_argument("scene", choices=list(PRESETS))
+	parser_run.add_argument("--steps", type=int, default=1000, help="number of steps (headless only)")
+	parser_run.add_argument("--headless", action="store_true", help="simulate without display")
+	parser_run.add_argument("--output", help=".npz file where the final positions are saved (headless only)")
+	parser_run.add_argument("--record", help="log file where the input events are recorded (viewer only, see session.py)")
+
+	parser_serve = commands.add_parser("serve", help="simulate a scene and stream it to remote viewers")
+	parser_serve.add_argument("scene", choices=list(PRESETS))
+	parser_serve.add_argument("--host", default="127.0.0.1", help="listening address (0.0.0.0 : every interface)")
+	parser_serve.add_argument("--port", type=int, default=8765, help="listening port (0 : any free port)")
+	parser_serve.add_argument("--quantum", type=float, default=1e-3, help="quantization step of the positions (m)")
+	parser_serve.add_argument("--frames", type=int, help="number of frames (default : until interrupted)")
+
+	parser_replay = commands.add_parser("replay", help="replay a recorded session without display")
+	parser_replay.add_argument("session", help="session log file (run --record)")
+	parser_replay.add_argument("--draw", action="store_true", help="also draw the frames (off-screen)")
+	parser_replay.add_argument("--output", help=".npz file where the phase timings of every frame are saved")
+
+	parser_view = commands.add_parser("view", help="watch a served scene")
+	parser_view.add_argument("address", help="HOST:PORT of the server")
+	parser_view.add_argument("--headless", action="store_true", help="receive frames without display, and print the bandwidth")
+	parser_view.add_argument("--frames", type=int, help="number of frames to receive (headless only)")
+
+	for subparser in (parser_run, parser_serve):
+		subparser.add_argument("--solver", choices=("euler", "xpbd", "domains"), default="euler")
+		subparser.add_argument("--processes", type=int, help="worker processes per large object (domains solver)")
+		subparser.add_argument("--substeps", type=int, default=4, help="XPBD substeps")
+		subparser.add_argument("--iterations", type=int, default=5, help="XPBD iterations")
+		subparser.add_argument("--workers", type=int, default=1, help="threads used to update the objects")
+		subparser.add_argument("--multirate", action="store_true", help="substeps of each object derived from its stiffness")
+		subparser.add_argument("--continuous", action="store_true", help="swept collisions with the container box")
+
+	args = parser.parse_args(args)
+
+	if args.command == "list":
+		for name, (fps, build) in PRESETS.items():
+			print("{:20} {:4} fps".format(name, fps))
+		return 0
+
+	return {"run" : run, "serve" : serve, "replay" : replay, "view" : view}[args.command](args)
+
+
+if __name__ == "__main__":
+	sys.exit(main())
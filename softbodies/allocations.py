@@ -0,0 +1,124 @@
+"""
+allocations.py
+
+Allocation check of the step pipeline
+
+The objects write the temporaries of a step into preallocated work arrays (see scratch.py) :
+a steady-state World.step() must not allocate memory proportional to the number of points or springs,
+which would cause latency spikes in long interactive sessions.
+The check runs the same scene at two sizes under tracemalloc (numpy reports its array allocations to it) :
+the peak of the memory allocated during the steps must not grow with the number of points.
+(numpy's iterators still allocate fixed-size buffers, for broadcasting and where= masks)
+The objects are updated one after the other : with worker threads, the peak would depend on how their
+steps interleave, and the check would not be deterministic.
+
+Command line :
+	python -m softbodies.allocations [--solver euler|xpbd] [--steps N] [--limit BYTES]
+"""
+import sys
+import argparse
+import tracemalloc
+from typing import List
+
+import numpy as np
+
+from .elements import Point, SoftBall, SpringyBox, SpringyStructure, NetObject
+from .fields import Wind, Attractor, Vortex, GridField
+from .solvers import XPBDSolver
+from .world import World
+
+
+# (bytes) default limit of the peak growth between the two sizes :
+# at the smallest size, a (n, 2) array of any object is larger than 64 kB
+LIMIT = 16 * 1024
+SCALES = (1, 4)  # Sizes of the scene (multiples of the number of points)
+TORN_POINTS = 16  # Number of steps during which the torn object of the scene breaks springs
+
+
+def large_world(scale : int=1, **options) -> World:
+	"""A scene with every object type and every force field type, with more than 5000 * scale points per object
+	(pinned points, and objects whose points are all dynamic), and an object that tears at every step
+	options : World options
+	"""
+	world = World(1/200, xmax=100., ymax=100., **options)
+	side = int(70 * scale**0.5)
+
+	world.addObject(NetObject(Point(1, 1), 1000., 0.1, 2 * side, side // 2, 5, 1.))
+	world.addObject(SpringyStructure(Point(20, 1), 1000., 0.1, side, side, 30, 0.2, breaking=10.))  # Breakable springs
+	world.addObject(SoftBall(Point(50, 50), 1000., 10., 5000 * scale, 40, 0.1, 60, 0.2))
+	world.addObject(SpringyBox(Point(80, 10), 1., 0.5, 7, 0.2))
+
+	# A grabbed point, as during a mouse drag
+	world.objectList[1].grabPoint(50)
+
+	# Tearing : every step, a kinematic point jumps away and its springs (the only breakable ones) break
+	net = NetObject(Point(1, 60), 1000., 0.1, 2 * side, side // 2, 5, 1., shear_k=5., bending_k=2.)
+	world.addObject(net)
+
+	points = (2 * side + 1) * (side // 4) + 5 + 3 * np.arange(TORN_POINTS)
+	rest = net.pos[points].copy()
+	jumps = (np.arange(TORN_POINTS) + 0.5) * world.dt  # Time of the jump of each point
+
+	net.addKinematic(points, lambda t: rest - np.outer(t >= jumps, (0., 10.)))
+
+	for _, springs in net.spring_sets():
+		springs.setBreaking(np.where(np.isin(springs.i1, points) | np.isin(springs.i2, points), 1., np.inf))
+
+	# Every external force field type, on top of the default gravity
+	world.addField(Wind((2., 0.), 0.01, quadratic=True))
+	world.addField(Attractor((50., 80.), 10., 1.))
+	world.addField(Vortex((50., 50.), 5., 1.))
+	world.addField(GridField(np.zeros((11, 11, 2)), spacing=10.))
+
+	return world
+
+
+def measure(world : World, steps : int=10, warmup : int=2) -> int:
+	"""Returns the peak of the memory allocated during the steps (bytes),
+	after warmup steps that allocate the work arrays
+	"""
+	for _ in range(warmup):
+		world.step()
+
+	tracemalloc.start()
+
+	try:
+		for _ in range(steps):
+			world.step()
+
+		return tracemalloc.get_traced_memory()[1]
+
+	finally:
+		tracemalloc.stop()
+
+
+def main(args : List[str]=None) -> int:
+
+	parser = argparse.ArgumentParser(description="Allocation check of the step pipeline")
+	parser.add_argument("--solver", action="append", choices=("euler", "xpbd"), help="solvers to check (all by default)")
+	parser.add_argument("--steps", type=int, default=10, help="number of measured steps")
+	parser.add_argument("--limit", type=int, default=LIMIT, help="maximal growth of the allocated memory peak (bytes)")
+	args = parser.parse_args(args)
+
+	failures = 0
+	for solver in args.solver or ("euler", "xpbd"):
+
+		peaks = []
+		for scale in SCALES:
+
+			world = large_world(scale, solver=XPBDSolver(4, 5) if solver == "xpbd" else None)
+			peaks.append(measure(world, args.steps))
+			world.close()
+
+		growth = peaks[-1] - peaks[0]
+
+		print("{} : peak {} bytes allocated during {} steps, {} bytes at {} times the number of points ({})".format(
+			solver, peaks[0], args.steps, peaks[-1], SCALES[-1] // SCALES[0],
+			"ok" if growth <= args.limit else "grows by more than {} bytes".format(args.limit)))
+		failures += growth > args.limit
+
+	return 1 if failures else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
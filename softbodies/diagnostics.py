@@ -0,0 +1,179 @@
+"""
+diagnostics.py
+
+Energy and deformation diagnostics, recorded every few steps into fixed-size ring buffers
+
+Recorded quantities (FIELDS), for each object and for the whole world :
+kinetic : kinetic energy, sum of m v² / 2 (J)
+potential : gravitational potential energy, sum of m g y (J)
+elastic : spring elastic energy, sum of k (length - l0)² / 2 (J)
+total : kinetic + potential + elastic (J)
+area_ratio : surface() / S0 for SoftBall objects (mean over the SoftBalls for the world), nan otherwise
+max_strain : maximum spring strain |length - l0| / l0
+
+Every quantity is a vectorized reduction over the object arrays. The buffers have a fixed size :
+the memory and the per-step cost stay bounded, diagnostics can be left on during long runs.
+
+Usage :
+	world.diagnostics = Diagnostics(every=10)
+	...
+	world.diagnostics.to_csv("energy.csv")
+"""
+import numpy as np
+from typing import List
+
+from .elements import Object, SoftObject, SoftBall
+
+
+FIELDS = ("step", "time", "kinetic", "potential", "elastic", "total", "area_ratio", "max_strain")
+
+
+class RingBuffer:
+	"""Fixed-size buffer of rows : when full, the oldest rows are overwritten
+
+	capacity : maximum number of rows
+	width : number of values per row
+	"""
+
+	def __init__(self, capacity : int, width : int=len(FIELDS)):
+
+		self.buffer = np.full((capacity, width), np.nan)
+		self.count = 0  # Number of rows appended since the creation
+
+
+	def __len__(self) -> int:
+		return min(self.count, len(self.buffer))
+
+
+	def append(self, row : np.ndarray):
+
+		self.buffer[self.count % len(self.buffer)] = row
+		self.count += 1
+
+
+	def data(self) -> np.ndarray:
+		"""Returns the rows in chronological order"""
+
+		if self.count <= len(self.buffer):
+			return self.buffer[:self.count].copy()
+
+		return np.roll(self.buffer, -(self.count % len(self.buffer)), 0)
+
+
+	def last(self) -> np.ndarray:
+		"""Returns the last row"""
+		return self.buffer[(self.count - 1) % len(self.buffer)]
+
+
+class Diagnostics:
+	"""Diagnostics recorder, attached to a World (world.diagnostics)
+
+	every : the quantities are computed every k steps
+	capacity : size of each ring buffer (number of records)
+	g : gravity acceleration used for the potential energy (m/s²) : the other force fields (see fields.py) are not counted
+	strain_limit : maximum spring strain over which an object is considered diverging (see diverging())
+
+	world : ring buffer of the whole world
+	objects : ring buffers of each object (same order as world.objectList)
+	"""
+
+	def __init__(self, every : int=10, capacity : int=1024, g : float=9.81, strain_limit : float=1.):
+
+		self.every = every
+		self.capacity = capacity
+		self.g = g
+		self.strain_limit = strain_limit
+
+		self.world = RingBuffer(capacity)
+		self.objects : List[RingBuffer] = []
+
+
+	def update(self, world):
+		"""Called by the World after each step : records the quantities every k steps"""
+
+		if world.steps % self.every == 0:
+			self.record(world)
+
+
+	def record(self, world):
+		"""Computes and records the quantities of every object, and of the world"""
+
+		while len(self.objects) < len(world.objectList):  # New objects
+			self.objects.append(RingBuffer(self.capacity))
+
+		time = world.steps * world.dt
+		rows = np.array([self.measure(obj) for obj in world.objectList]).reshape(-1, len(FIELDS) - 2)
+
+		for buffer, row in zip(self.objects, rows):
+			buffer.append((world.steps, time, *row))
+
+		kinetic, potential, elastic, total = rows[:, :4].sum(0)
+		area_ratio = np.nanmean(rows[:, 4]) if not np.isnan(rows[:, 4]).all() else np.nan
+		max_strain = np.nanmax(rows[:, 5]) if not np.isnan(rows[:, 5]).all() else np.nan
+
+		self.world.append((world.steps, time, kinetic, potential, elastic, total, area_ratio, max_strain))
+
+
+	def measure(self, obj : Object) -> tuple:
+		"""Returns (kinetic, potential, elastic, total, area_ratio, max_strain) for an object"""
+
+		kinetic = np.sum(obj.m * np.sum(obj.v**2, 1)) / 2
+		potential = self.g * np.dot(obj.m, obj.pos[:, 1])
+
+		elastic, max_strain = 0., np.nan
+
+		if isinstance(obj, SoftObject) and any(len(springs) > 0 for _, springs in obj.spring_sets()):
+
+			# Every spring set : main, shear and bending springs (the main springs may all be torn)
+			max_strain = 0.
+
+			for _, springs in obj.spring_sets():
+
+				delta = obj.pos[springs.i2] - obj.pos[springs.i1]
+				extension = np.sqrt(np.sum(delta**2, 1)) - springs.l0
+
+				elastic += np.dot(springs.k, extension**2) / 2
+				max_strain = np.max(np.abs(extension) / springs.l0, initial=max_strain)
+
+		area_ratio = obj.surface() / obj.S0 if isinstance(obj, SoftBall) else np.nan
+
+		return kinetic, potential, elastic, kinetic + potential + elastic, area_ratio, max_strain
+
+
+	def diverging(self) -> List[int]:
+		"""Returns the indices of the objects whose last record is not finite,
+		or whose maximum spring strain is over strain_limit (early blow-up detection)
+		"""
+		result = []
+
+		for i, buffer in enumerate(self.objects):
+
+			if len(buffer) == 0:
+				continue
+
+			row = buffer.last()
+			if not np.isfinite(row[2:6]).all() or row[7] > self.strain_limit:
+				result.append(i)
+
+		return result
+
+
+	def to_npz(self, path : str):
+		"""Export the buffers to a .npz file : 'fields', 'world', and 'object_0', 'object_1'..."""
+
+		arrays = {"object_" + str(i) : buffer.data() for i, buffer in enumerate(self.objects)}
+
+		np.savez(path, fields=np.array(FIELDS), world=self.world.data(), **arrays)
+
+
+	def to_csv(self, path : str):
+		"""Export the buffers to a .csv file, one line per record
+		The 'object' column is the index of the object, or -1 for the world
+		"""
+		blocks = [np.column_stack((np.full(len(self.world), -1), self.world.data()))]
+
+		for i, buffer in enumerate(self.objects):
+			blocks.append(np.column_stack((np.full(len(buffer), i), buffer.data())))
+
+		np.savetxt(path, np.concatenate(blocks), delimiter=",", header=",".join(("object",) + FIELDS),
+			comments="", fmt=["%d", "%d"] + ["%.10g"] * (len(FIELDS) - 1))
@@ -0,0 +1,309 @@
+"""
+domains.py
+
+Domain decomposition of a large object across processes
+
+A single NetObject or SpringyStructure with millions of springs cannot be split by the object-level
+parallelism of the World (see World.partition). DomainSolver splits its points into tiles instead :
+contiguous ranges of point indices, which are bands of rows of the grid. Each tile is owned by a worker process.
+
+Shared state : the positions, velocities and states of the object are moved into shared memory (obj.pos,
+obj.v and obj.state become views of it), which the main process and the workers read and write in place.
+
+Halos : a worker holds a local SoftObject made of the points of its tile, then of its halo points (the points
+of the other tiles linked to its tile by a spring), and of every spring attached to its tile. At each step, the
+worker gathers the positions and velocities of its tile and halo from the shared memory, waits for the other
+workers to have gathered theirs, computes the forces and integrates its local object (the halo points are
+pinned : their forces are computed by their own tile), then writes its tile back into the shared memory.
+
+Force fields : the fields of the object (World.addField, removeField, or a field's parameters) are compared with
+the ones the workers hold before each step, and sent to every worker when they have changed.
+
+A point gets the same springs, in the same order, in its tile as in the whole object : the results match
+the serial EulerSolver up to the rounding of the sums.
+"""
+import os
+import pickle
+import numpy as np
+import multiprocessing
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+from typing import Dict, List
+
+from .elements import Object, SoftObject, SpringArray, SpringyStructure, NetObject, DYNAMIC, PINNED, KINEMATIC
+from .solvers import EulerSolver
+
+
+class DomainSolver(EulerSolver):
+	"""Force-based engine (see EulerSolver) that updates each large NetObject or SpringyStructure
+	with a pool of worker processes, one tile of the object per process
+
+	processes : number of worker processes per decomposed object (number of CPUs by default)
+	min_points : smaller objects are updated by the main process, like with an EulerSolver
+	timeout : (s) maximum duration of a step, after which the workers are considered failed
+
+	An object is decomposed at its first step : its point states (setState, grabPoint) may change afterwards,
+	but not its springs, precision or number of points. Breakable springs (see SoftObject.tear_springs) are not
+	decomposed : those objects are updated by the main process. The forces array obj.f of a decomposed object
+	is not updated. Call close() (or World.close()) to stop the workers.
+	"""
+
+	def __init__(self, processes : int=None, min_points : int=20000, timeout : float=60.):
+
+		self.processes = processes or os.cpu_count() or 1
+		self.min_points = min_points
+		self.timeout = timeout
+
+		self.domains : Dict[Object, Domain] = {}  # Decomposed objects
+
+
+	def decomposable(self, obj : Object) -> bool:
+		"""True if the object is updated by worker processes"""
+
+		return (self.processes > 1 and isinstance(obj, (SpringyStructure, NetObject)) and len(obj.pos) >= self.min_points
+			and not any(springs.breakable for _, springs in obj.spring_sets()))
+
+
+	def step(self, obj : Object, dt : float, bounds : tuple=None):
+		"""Reimplementation of base class method : the decomposable objects are updated by their workers"""
+
+		domain = self.domains.get(obj)
+
+		if domain is None:
+			if not self.decomposable(obj):
+				return super().step(obj, dt, bounds)
+
+			domain = self.domains[obj] = Domain(obj, self.processes, self.timeout)
+
+		domain.step(dt)
+
+
+	def close(self):
+		"""Stops the workers of every decomposed object. The objects get back their own arrays"""
+
+		for domain in self.domains.values():
+			domain.close()
+
+		self.domains.clear()
+
+
+class Domain:
+	"""Tiles of one object, and the worker processes that update them
+
+	obj : decomposed object, whose pos, v and state arrays are replaced by views of the shared memory
+	processes : number of tiles and worker processes
+	"""
+
+	def __init__(self, obj : SoftObject, processes : int, timeout : float):
+
+		self.obj = obj
+		self.timeout = timeout
+
+		# Shared point arrays, initialized with the object's arrays
+		self.memory = {}
+		self.shared = {}
+
+		for name in ("pos", "v", "state"):
+
+			array = getattr(obj, name)
+			memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+
+			shared = np.ndarray(array.shape, array.dtype, buffer=memory.buf)
+			shared[:] = array
+			setattr(obj, name, shared)
+
+			self.memory[name] = memory
+			self.shared[name] = (memory.name, array.shape, array.dtype)
+
+		context = multiprocessing.get_context()
+
+		# Shared time step : dt, or nan to stop the workers
+		self.dt = context.RawValue("d", 0.)
+
+		# Force fields of the workers (pickled, None : not sent yet) and their version, incremented
+		# when new fields are sent through the pipes
+		self.fields = None
+		self.fields_version = context.RawValue("i", 0)
+		pipes = [context.Pipe(duplex=False) for _ in range(processes)]
+		self.pipes = [sender for _, sender in pipes]
+
+		# Each step : started (every worker and the main process), gathered (the workers have read the
+		# shared arrays, they can be written), done (the tiles have been written)
+		self.started = context.Barrier(processes + 1)
+		self.gathered = context.Barrier(processes)
+		self.done = context.Barrier(processes + 1)
+
+		self.workers = [
+			context.Process(target=run_tile, daemon=True, name="tile-{}".format(i),
+				args=(tile, self.shared, self.dt, self.started, self.gathered, self.done, self.fields_version, receiver))
+			for i, (tile, (receiver, _)) in enumerate(zip(Domain.tiles(obj, processes), pipes))
+		]
+
+		for worker in self.workers:
+			worker.start()
+
+
+	@staticmethod
+	def tiles(obj : SoftObject, processes : int) -> List[dict]:
+		"""Splits the points of the object into processes tiles of contiguous indices
+		Returns the arrays of each tile : its range of points, its halo points, masses, precision,
+		and its spring sets in local indices (the points of the tile first, then the halo points)
+		"""
+		n = len(obj.pos)
+		bounds = np.linspace(0, n, processes + 1).astype(int)
+		tiles = []
+
+		for start, end in zip(bounds[:-1], bounds[1:]):
+
+			# Springs attached to a point of the tile, in the order of the object
+			selected = {}
+			for name, springs in obj.spring_sets():
+				selected[name] = np.flatnonzero(
+					((springs.i1 >= start) & (springs.i1 < end)) | ((springs.i2 >= start) & (springs.i2 < end)))
+
+			linked = np.unique(np.concatenate([np.zeros(0, dtype=int)] + [
+				indices[selected[name]] for name, springs in obj.spring_sets() for indices in (springs.i1, springs.i2)]))
+			halo = linked[(linked < start) | (linked >= end)]
+
+			def local(indices : np.ndarray) -> np.ndarray:
+				"""Local index of the given points of the tile or of its halo"""
+				inside = (indices >= start) & (indices < end)
+				return np.where(inside, indices - start, end - start + np.searchsorted(halo, indices))
+
+			points = np.concatenate((np.arange(start, end), halo))
+
+			tiles.append({
+				"start" : start, "end" : end, "points" : points,
+				"m" : obj.m[points],
+				"dtype" : obj.pos.dtype, "force_dtype" : obj.f.dtype,
+				"sets" : {
+					name : {
+						"i1" : local(springs.i1[selected[name]]), "i2" : local(springs.i2[selected[name]]),
+						"l0" : springs.l0[selected[name]], "k" : springs.k[selected[name]], "kd" : springs.kd[selected[name]]
+					}
+					for name, springs in obj.spring_sets()
+				}
+			})
+
+		return tiles
+
+
+	def step(self, dt : float):
+		"""Updates the object over a dt time step : the workers update the tiles, then the main process
+		moves the kinematic points (their trajectory callbacks are not sent to the workers)
+		"""
+		self.dt.value = dt
+
+		# The force fields are sent if they have changed since the last step, once the workers have started
+		# the step (they read the pipes when the version has changed)
+		fields = pickle.dumps(self.obj.fields)
+		changed = fields != self.fields
+
+		if changed:
+			self.fields = fields
+			self.fields_version.value += 1
+
+		try:
+			self.started.wait(self.timeout)
+
+			if changed:
+				for pipe in self.pipes:
+					pipe.send_bytes(fields)
+
+			self.done.wait(self.timeout)
+
+		except BrokenBarrierError:
+			raise RuntimeError("a worker process of the decomposed object has failed") from None
+
+		self.obj.update_kinematic(dt)
+
+
+	def close(self):
+		"""Stops the workers, and gives the object a copy of the shared arrays"""
+
+		self.dt.value = np.nan
+
+		try:
+			self.started.wait(self.timeout)
+		except BrokenBarrierError:
+			pass
+
+		for worker in self.workers:
+			worker.join(self.timeout)
+
+			if worker.is_alive():
+				worker.terminate()
+
+		for pipe in self.pipes:
+			pipe.close()
+
+		for name, memory in self.memory.items():
+			setattr(self.obj, name, np.array(getattr(self.obj, name)))
+			memory.close()
+			memory.unlink()
+
+
+def run_tile(tile : dict, shared : dict, dt, started, gathered, done, fields_version, fields):
+	"""Worker process : updates a tile at each step (see Domain), until dt is nan
+	fields : pipe that receives the force fields, when fields_version is incremented
+	"""
+
+	memories = [shared_memory.SharedMemory(name=name) for name, _, _ in shared.values()]
+	pos, v, state = [np.ndarray(shape, dtype, buffer=memory.buf) for memory, (_, shape, dtype) in zip(memories, shared.values())]
+
+	start, end, points = tile["start"], tile["end"], tile["points"]
+	own = end - start
+
+	sets = {name : SpringArray(**arrays) for name, arrays in tile["sets"].items()}
+	obj = SoftObject(np.zeros((len(points), 2)), tile["m"], sets["spring"], None,
+		np.arange(own, len(points)), sets.get("shear"), sets.get("bending"))  # Halo points are pinned
+	obj.setPrecision(tile["dtype"], tile["force_dtype"])
+	version = 0  # Version of the force fields of obj (sent at the first step)
+
+	states = np.full(own, -1, dtype=np.int8)  # States of the tile points, set at the first step
+	local = np.arange(own)
+
+	try:
+		while True:
+			started.wait()
+
+			if np.isnan(dt.value):
+				break
+
+			if version != fields_version.value:
+				obj.fields = pickle.loads(fields.recv_bytes())
+				version = fields_version.value
+
+			# Gather the tile and its halo
+			np.take(pos, points, axis=0, out=obj.pos, mode="clip")
+			np.take(v, points, axis=0, out=obj.v, mode="clip")
+
+			if not np.array_equal(state[start:end], states):
+				states[:] = state[start:end]
+				for value in (DYNAMIC, PINNED, KINEMATIC):
+					obj.setState(local[states == value], value)
+
+			gathered.wait()
+
+			obj.reset_forces()
+			obj.spring_forces()
+			obj.field_forces()
+			obj.update_points(dt.value)
+
+			pos[start:end] = obj.pos[:own]
+			v[start:end] = obj.v[:own]
+
+			done.wait()
+
+	except BrokenBarrierError:
+		pass
+
+	except BaseException:
+		for barrier in (started, gathered, done):
+			barrier.abort()
+		raise
+
+	finally:
+		del pos, v, state
+		for memory in memories:
+			memory.close()
@@ -0,0 +1,1298 @@
+"""
+elements.py
+
+Basic classes of elements that are used in the 2D engine
+
+Objects store their state in numpy arrays (one row per point) :
+pos, v, f : (n, 2) arrays of positions, velocities and forces
+m : (n,) array of point masses
+Springs are stored in a SpringArray, that holds one array per spring parameter.
+This allows meshes to be built and updated without any Python loop over points or springs.
+"""
+import numpy as np
+from typing import List, Callable  # type hints for lists  TODO : python 3.9 -> 'list' now works
+
+from .math_func import norm
+from .scratch import Scratch, Scatter
+from .fields import Gravity
+from .topology import TOPOLOGY_CACHE
+
+
+GRAB_MIN = 0.02  # (m) minimal distance between mouse and grabbed point, when attraction stops
+
+# Point states, stored in Object.state
+DYNAMIC = 0  # moved by the forces applied on it (Euler integration)
+PINNED = 1  # never moves
+KINEMATIC = 2  # moved by a script (trajectory callback, mouse grab...), ignores forces
+
+class Point:
+	"""Basic 2D coordinates container
+
+	pos : x, y : 2D coordinates
+	m : mass (kg)
+	v : vx, vy : 2D velocity vector coordinates
+	f : fx, fy : 2D force vector coordinates
+
+	Can also be used to return x,y coordinates
+	np.array are simpler to use for Euler integration method
+	x(), y() methods are still implemented for simplification
+	"""
+
+	def __init__(self, x : float, y : float, m : float=0):
+
+		self.pos = np.array([x, y])
+		self.v = np.array([0., 0.])  # IMPORTANT : type must be float
+		self.f = np.array([0., 0.])
+
+		self.m = m
+
+	@property  # call function without brackets
+	def x(self) -> float:
+		return self.pos[0]
+
+	@property
+	def y(self) -> float:
+		return self.pos[1]
+
+
+
+class Spring:
+	"""Spring class
+
+	i1, i2 : Point id in the Object that contains the spring
+	l0 : rest length (m), equal to the distance between pt1 & pt2 at rest (initially)
+	k : spring stiffness (N/m)
+	kd : spring damping (N/v)
+	"""
+
+	def __init__(self, i1 : int, i2 : int, l0 : float, k : float, kd : float):
+
+		self.i1 = i1
+		self.i2 = i2
+		self.l0 = l0
+		self.k = k
+		self.kd = kd
+
+
+class SpringArray:
+	"""Vectorized spring container
+
+	Stores the parameters of many springs as arrays (one value per spring) :
+	i1, i2 : point indices arrays
+	l0 : rest lengths array (m)
+	k : stiffness array (N/m)
+	kd : damping array (N/v)
+	breaking : breaking strain array : a spring breaks when (length - l0) / l0 exceeds it (inf : unbreakable)
+
+	k, kd and breaking can be given as scalars : they are then shared by all the springs
+	Iterating over a SpringArray yields Spring instances (slow, only use it for display or debugging)
+	"""
+
+	ARRAYS = ("i1", "i2", "l0", "k", "kd", "breaking")  # Per-spring arrays
+
+	def __init__(self, i1 : np.ndarray=None, i2 : np.ndarray=None, l0 : np.ndarray=None, k=0., kd=0., breaking=np.inf):
+
+		self.i1 = np.zeros(0, dtype=int) if i1 is None else np.asarray(i1, dtype=int)
+		self.i2 = np.zeros(0, dtype=int) if i2 is None else np.asarray(i2, dtype=int)
+
+		n = len(self.i1)
+		self.l0 = np.zeros(n) if l0 is None else np.broadcast_to(np.asarray(l0, dtype=float), n).copy()
+		self.k = np.broadcast_to(np.asarray(k, dtype=float), n).copy()
+		self.kd = np.broadcast_to(np.asarray(kd, dtype=float), n).copy()
+
+		self.setBreaking(breaking)
+
+
+	def __len__(self) -> int:
+		return len(self.i1)
+
+
+	def __getitem__(self, i : int) -> Spring:
+		return Spring(int(self.i1[i]), int(self.i2[i]), float(self.l0[i]), float(self.k[i]), float(self.kd[i]))
+
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
+
+
+	def append(self, spring : Spring):
+		"""Add a single spring (slow : reallocates every array)"""
+
+		self.extend(SpringArray([spring.i1], [spring.i2], [spring.l0], spring.k, spring.kd))
+
+
+	def extend(self, springs : 'SpringArray'):
+		"""Add all the springs of another SpringArray"""
+
+		self.i1 = np.concatenate((self.i1, springs.i1))
+		self.i2 = np.concatenate((self.i2, springs.i2))
+
+		# The parameters keep the precision of this SpringArray
+		self.l0 = np.concatenate((self.l0, springs.l0)).astype(self.l0.dtype, copy=False)
+		self.k = np.concatenate((self.k, springs.k)).astype(self.k.dtype, copy=False)
+		self.kd = np.concatenate((self.kd, springs.kd)).astype(self.kd.dtype, copy=False)
+
+		self.breaking = np.concatenate((self.breaking, springs.breaking))
+		self.breakable = self.breakable or springs.breakable
+
+
+	def setBreaking(self, breaking):
+		"""Set the breaking strain of the springs (scalar or array, inf : unbreakable)"""
+
+		self.breaking = np.broadcast_to(np.asarray(breaking, dtype=float), len(self)).copy()
+		self.breakable = bool(np.isfinite(self.breaking).any())  # False : the strains are not checked
+
+
+	def swap_remove(self, indices : np.ndarray, callback : Callable[[int, int], None]=None):
+		"""Removes the springs at the given sorted indices in O(len(indices)) : each removed spring is replaced
+		by the last spring. The arrays become views of their first len(self) - len(indices) elements
+		callback(spring, last) : called before spring is overwritten by spring last (see Scratch.swap_remove)
+		"""
+		count = len(self)
+		arrays = [getattr(self, name) for name in SpringArray.ARRAYS]
+
+		for spring in indices[::-1]:  # Descending : the last spring is never one that is still to remove
+
+			count -= 1
+
+			if callback is not None:
+				callback(int(spring), count)
+
+			for array in arrays:
+				array[spring] = array[count]
+
+		for name, array in zip(SpringArray.ARRAYS, arrays):
+			setattr(self, name, array[:count])
+
+
+	def astype(self, dtype):
+		"""Set the precision of the spring parameters (l0, k, kd)"""
+
+		self.l0 = self.l0.astype(dtype, copy=False)
+		self.k = self.k.astype(dtype, copy=False)
+		self.kd = self.kd.astype(dtype, copy=False)
+
+
+	@staticmethod
+	def concatenate(springs : List['SpringArray']) -> 'SpringArray':
+		"""Build a single SpringArray out of a list of SpringArrays"""
+
+		result = SpringArray()
+		for s in springs:
+			result.extend(s)
+
+		return result
+
+
+## MAIN BASE CLASS
+
+class Object:
+	"""Object class
+
+	Base class of any object that is rendered in the 2D engine :
+	Contains the state of its points in the direct order of rotation
+	(better in order to compute normal ext vectors)
+	Contains helful methods for other classes that inherit from it
+
+	pos : (n, 2) array of point positions
+	m : (n,) array of point masses
+	state : (n,) array of point states : DYNAMIC, PINNED or KINEMATIC
+	edge : indices of the points that define the edge of the shape, and that are important for displaying
+	it (pygame draw polygon)
+	pinned : indices of the points that never move
+	fields : external force fields applied to the points (gravity by default, see fields.py)
+	"""
+
+	def __init__(self, pos : np.ndarray, m : np.ndarray, edge : np.ndarray = None, pinned : np.ndarray = None):
+
+		# Point state arrays
+		self.pos = np.asarray(pos, dtype=float)
+		self.v = np.zeros_like(self.pos)  # IMPORTANT : type must be float
+		self.f = np.zeros_like(self.pos)
+		self.m = np.asarray(m, dtype=float)
+
+		# special points & default values
+		n = len(self.pos)
+		self.edge = np.arange(n) if edge is None else np.asarray(edge, dtype=int)
+
+		# Point states : only DYNAMIC points are integrated
+		self.state = np.full(n, DYNAMIC, dtype=np.int8)
+		self.dynamic = slice(None)  # Dynamic subset : every point, or a boolean mask (see setState)
+
+		# Kinematic points driven by a trajectory callback : list of (indices, trajectory)
+		self.kinematic_drivers = []
+		self.t = 0.  # (s) time since the object creation, given to trajectory callbacks
+
+		if pinned is not None:
+			self.setState(pinned, PINNED)
+
+		# Index of a point in the shape that has been grabbed and is treated differently
+		self.grabbed_point : int = None
+		self.grabbed_state : int = None  # State of the grabbed point before it was grabbed, restored on release
+
+		self.scratch = Scratch()  # Work arrays of the step computations
+
+		# Number of solver steps per World step (multi-rate integration, see World) : None for 1,
+		# or set by the World from the object's stable time step
+		self.substeps : int = None
+
+		# External force fields (see fields.py) : replaced by the list of the World the object is added to
+		self.fields = [Gravity()]
+
+
+	def setPrecision(self, dtype, force_dtype=None):
+		"""Set the precision of the point arrays : np.float64 (default) or np.float32
+		force_dtype : precision of the force array (dtype by default). With np.float64, the forces are
+		accumulated in double precision even though the state is stored in single precision
+		"""
+		self.pos = self.pos.astype(dtype, copy=False)
+		self.v = self.v.astype(dtype, copy=False)
+		self.m = self.m.astype(dtype, copy=False)
+		self.f = self.f.astype(force_dtype or dtype, copy=False)
+
+
+	def setState(self, indices : np.ndarray, state : int):
+		"""Sets the state (DYNAMIC, PINNED, KINEMATIC) of the given points
+		and updates the dynamic subset used for integration
+		"""
+		self.state[indices] = state
+
+		dynamic = self.state == DYNAMIC
+
+		# When every point is dynamic, a slice (where=True, see where_dynamic) avoids masking the arrays
+		self.dynamic = slice(None) if dynamic.all() else dynamic
+
+
+	def where_dynamic(self, columns : bool=True):
+		"""Returns the where= argument of the ufuncs that only update the dynamic points :
+		True if every point is dynamic, the dynamic mask otherwise
+		columns : mask of the (n, 2) arrays ((n, 1) mask) rather than of the (n,) arrays
+		"""
+		if isinstance(self.dynamic, slice):
+			return True
+
+		return self.dynamic[:, None] if columns else self.dynamic
+
+
+	def addKinematic(self, indices : np.ndarray, trajectory : Callable[[float], np.ndarray]):
+		"""Sets the given points as KINEMATIC points that follow a scripted trajectory
+		trajectory(t) : returns the (len(indices), 2) positions of the points at time t (s)
+		"""
+		indices = np.asarray(indices, dtype=int)
+
+		self.setState(indices, KINEMATIC)
+		self.kinematic_drivers.append((indices, trajectory))
+
+
+	def barycentre(self) -> Point:
+		"""Returns the shape's barycentre : average position and velocity"""
+
+		barycentre = Point(0, 0)
+
+		barycentre.pos = np.average(self.pos, 0)
+
+		barycentre.v = np.average(self.v, 0)
+
+		return barycentre
+
+
+	def boundingBox(self) -> List[Point]:
+		"""Returns the bounding box of the object :
+		(pt1, pt2)
+		pt1 : point with the lowest x,y coordinates
+		pt2 : point with the highest x,y coordinates
+		"""
+		lowest = self.pos.min(0)
+		highest = self.pos.max(0)
+
+		return Point(*lowest), Point(*highest)
+
+
+	def isInBoundingBox(self, point : Point) -> bool:
+		"""Checks if given point is in the Object's bouding box
+		in order to limit complexity and avoid calling self.isIn each time
+		"""
+
+		pt1, pt2 = self.boundingBox()
+
+		if point.x > pt2.x or point.y > pt2.y or point.x < pt1.x or point.y < pt1.y:
+			return False
+		return True
+
+
+	def isIn(self, point : Point) -> bool:
+		"""Checks if given point is inside the object (see contains)"""
+
+		return bool(self.contains(point.pos[None])[0])
+
+
+	def contains(self, points : np.ndarray, chunk : int=2**18) -> np.ndarray:
+		"""Returns the (M,) boolean array of the given (M, 2) points that are inside the object's outline
+		(polygon of the edge points)
+
+		Method used : winding number of the outline around each point (nonzero rule), correct for concave
+		and self-overlapping outlines. The points out of the bounding box of the outline are rejected first,
+		then the winding numbers of the other points are computed over all the sides at once, by blocks of
+		about chunk (point, side) pairs
+		"""
+		points = np.asarray(points, dtype=float).reshape(-1, 2)
+		inside = np.zeros(len(points), dtype=bool)
+
+		outline = self.pos[self.edge]
+		if len(outline) < 3:
+			return inside
+
+		# Early rejection : bounding box of the outline
+		candidates = np.flatnonzero(np.all((points >= outline.min(0)) & (points <= outline.max(0)), axis=1))
+
+		# Sides (a, b) of the outline
+		a = outline
+		b = np.roll(outline, -1, 0)
+		side = b - a
+
+		block = max(1, chunk // len(outline))  # Points per block
+
+		for start in range(0, len(candidates), block):
+
+			indices = candidates[start:start + block]
+			p = points[indices, None]  # (m, 1, 2) : against every side
+
+			# Side of the line (a, b) the point is on : > 0 if on the left
+			left = side[:, 0] * (p[..., 1] - a[:, 1]) - (p[..., 0] - a[:, 0]) * side[:, 1]
+
+			# Upward crossings of the horizontal line through the point, on its right side : +1, downward : -1
+			below_a, below_b = a[:, 1] <= p[..., 1], b[:, 1] <= p[..., 1]
+			winding = np.count_nonzero(below_a & ~below_b & (left > 0), axis=1)
+			winding -= np.count_nonzero(~below_a & below_b & (left < 0), axis=1)
+
+			inside[indices] = winding != 0
+
+		return inside
+
+	# TODO : method that gives the closest coordinates that are out of the Object
+	# if a point is inside : could be used to compute a collision and avoid the
+	# merging of two objects
+
+	def grabNearestPoint(self, point : Point):
+		"""
+		Grabs the object's point which is nearest to point, and
+		applies an immediate change of position with a specific velocity
+		in order to "grab" the object with a mouse click
+		"""
+		# Get nearest point index (only dynamic points can be grabbed) :
+		candidates = np.flatnonzero(self.state == DYNAMIC)
+		if len(candidates) == 0:
+			return
+
+		distances = np.sum((self.pos[candidates] - point.pos)**2, 1)
+
+		self.grabPoint(candidates[np.argmin(distances)])
+
+
+	def grabPoint(self, i : int):
+		"""Set the point i as the "grabbed point" : it is moved by computeGrabbedPoint"""
+
+		self.releaseGrabbedPoint()
+
+		self.grabbed_point = i
+		self.grabbed_state = int(self.state[i])
+		self.setState(i, KINEMATIC)
+
+
+	def releaseGrabbedPoint(self):
+		"""Releases the grabbed point : it gets back its state (a dynamic point is moved by the forces applied on it again,
+		a pinned point stays at its new position)
+		"""
+		if self.grabbed_point is not None:
+			self.setState(self.grabbed_point, self.grabbed_state)
+
+			if self.grabbed_state == PINNED:
+				self.v[self.grabbed_point] = 0.  # Damping forces of its springs
+
+			self.grabbed_point = self.grabbed_state = None
+
+
+	def computeGrabbedPoint(self, mouse : Point, dt : float):
+		"""Moves the grabbed point closer to the mouse
+		Computes a velocity that scales with distance, in order to bring
+		the object closer to the mouse
+
+		In order to keep the grab force strong, even though the grabbed point
+		gets closer to the mouse, the velocity norm scales with the distance
+		bewteen the mouse and barycentre
+		"""
+
+		if self.grabbed_point is None:
+			return
+
+		# Compute a velocity that scales with distance, in order to bring the object
+		# closer to the mouse cursor quickly.
+
+		grabbed_pos = self.pos[self.grabbed_point]  # View on the grabbed point's position
+
+		velocity = (mouse.pos - grabbed_pos)  # Directly proportionnal to the distance
+
+		if norm(velocity) > GRAB_MIN or grabbed_pos[0] > mouse.x:
+			# Compute only if point not close enough, or hangs higher than mouse (less realistic)
+
+			velocity *= norm(mouse.pos - self.barycentre().pos) / norm(velocity)  # scaling with barycentre
+
+			# Update position
+			grabbed_pos += velocity *dt
+
+
+	def reset_forces(self):
+		"""Sets all points forces to 0 before physics processing"""
+
+		self.f.fill(0.)
+
+
+	def update(self, dt : float):
+		"""CALL AT EACH LOOP ITERATION :
+		Updates forces, velocities, and point positions
+		Only DYNAMIC points are moved by the forces applied on them
+
+		PINNED and KINEMATIC points will not be integrated by update_points method
+		"""
+		pass
+
+
+	def update_points(self, dt : float):
+		"""Updates the velocity and position of each point based on the forces applied on them
+		Euler's integration method
+		Kinematic points with a trajectory are then moved to their scripted position
+		"""
+		where = self.where_dynamic()
+
+		# Velocities : v += f * dt / m
+		acceleration = self.scratch.get("acceleration", self.f.shape, np.result_type(self.f, self.m))
+		np.multiply(self.f, dt, out=acceleration, where=where)
+		np.divide(acceleration, self.m[:, None], out=acceleration, where=where)
+		np.add(self.v, acceleration, out=self.v, where=where)
+
+		# Positions : pos += v * dt
+		displacement = self.scratch.get("displacement", self.pos.shape, self.v.dtype)
+		np.multiply(self.v, dt, out=displacement, where=where)
+		np.add(self.pos, displacement, out=self.pos, where=where)
+
+		self.update_kinematic(dt)
+
+
+	def update_kinematic(self, dt : float):
+		"""Moves the kinematic points that follow a trajectory to their position at the end of the time step"""
+
+		self.t += dt
+
+		for indices, trajectory in self.kinematic_drivers:
+
+			new_pos = trajectory(self.t)
+
+			# The velocity is kept consistent with the motion, for spring damping forces
+			self.v[indices] = (new_pos - self.pos[indices]) / dt
+			self.pos[indices] = new_pos
+
+
+	def compute_container_box_collision(self, xmin : float, xmax : float, ymin : float, ymax : float):
+		"""Computes the collisions with the box that contains all Objects
+		Solid contact : if there is a contact :
+		* tangent velocity = 0
+		* normal velocity *= -1
+
+		Only one wall is handled per point and per step, in this order of priority :
+		bottom, right, left, top
+		"""
+		x, y = self.pos[:, 0], self.pos[:, 1]
+		n = len(self.pos)
+		scratch = self.scratch
+
+		bottom = np.less(y, ymin, out=scratch.get("bottom", (n,), bool))
+		free = np.logical_not(bottom, out=scratch.get("free", (n,), bool))  # Points without a wall yet
+
+		# Each wall mask is a subset of free : xor removes its points from free
+		right = np.greater(x, xmax, out=scratch.get("right", (n,), bool))
+		np.logical_and(right, free, out=right)
+		np.logical_xor(free, right, out=free)
+
+		left = np.less(x, xmin, out=scratch.get("left", (n,), bool))
+		np.logical_and(left, free, out=left)
+		np.logical_xor(free, left, out=free)
+
+		top = np.greater(y, ymax, out=scratch.get("top", (n,), bool))
+		np.logical_and(top, free, out=top)
+
+		# Bottom and top walls : clamp y, invert vy, void tangent velocity vx
+		for wall, limit in ((bottom, ymin), (top, ymax)):
+			np.copyto(y, limit, where=wall)
+			np.negative(self.v[:, 1], out=self.v[:, 1], where=wall)
+			np.copyto(self.v[:, 0], 0., where=wall)
+
+		# Right and left walls : clamp x, invert vx, void tangent velocity vy
+		for wall, limit in ((right, xmax), (left, xmin)):
+			np.copyto(x, limit, where=wall)
+			np.negative(self.v[:, 0], out=self.v[:, 0], where=wall)
+			np.copyto(self.v[:, 1], 0., where=wall)
+
+
+	def compute_swept_box_collision(self, xmin : float, xmax : float, ymin : float, ymax : float, dt : float,
+		restitution : float=1.):
+		"""Continuous collisions with the box that contains all Objects, for large time steps
+
+		Each point moved in a straight line from pos - v * dt to pos during the last dt step : a point that
+		crossed a wall hits it at a fraction of the step, then bounces for the remaining fraction with the
+		normal velocity -restitution * vn (its position is mirrored across the wall, scaled by restitution).
+		As in compute_container_box_collision, the tangent velocity is voided at the impact : the tangent position
+		goes back to the impact point. A point that crosses two walls in the same step (corner) bounces on both.
+		Points that are out of the box but already moving inwards are only moved back onto the wall
+		"""
+		n, dtype = len(self.pos), self.pos.dtype
+		scratch = self.scratch
+
+		crossing = scratch.get("swept_crossing", (n, 2), bool)  # Points that crossed the wall of each axis
+		remaining = scratch.get("swept_remaining", (n, 2), dtype)  # Fraction of the step after the impact
+		outside = scratch.get("swept_outside", (n,), bool)
+		beyond = scratch.get("swept_beyond", (n,), bool)
+		wall = scratch.get("swept_wall", (n,), dtype)
+		depth = scratch.get("swept_depth", (n,), dtype)
+		travel = scratch.get("swept_travel", (n,), dtype)
+
+		remaining.fill(0.)
+
+		for axis, (low, high) in enumerate(((xmin, xmax), (ymin, ymax))):
+
+			p, v = self.pos[:, axis], self.v[:, axis]
+
+			# Wall crossed along this axis : low or high
+			np.less(p, low, out=outside)
+			np.greater(p, high, out=beyond)
+			np.logical_or(outside, beyond, out=outside)
+
+			if not outside.any():
+				crossing[:, axis] = False
+				continue
+
+			wall.fill(low)
+			np.copyto(wall, high, where=beyond)
+
+			# Depth and displacement during the step : same signs if the point crossed the wall outwards
+			np.subtract(p, wall, out=depth)
+			np.multiply(v, dt, out=travel)
+			np.multiply(depth, travel, out=remaining[:, axis])
+			np.greater(remaining[:, axis], 0., out=crossing[:, axis])
+			np.logical_and(crossing[:, axis], outside, out=crossing[:, axis])
+
+			# Points moving inwards : back onto the wall
+			np.logical_xor(outside, crossing[:, axis], out=beyond)
+			np.copyto(p, wall, where=beyond)
+
+			# Crossing points : fraction of the step after the impact, mirrored position and velocity
+			remaining[:, axis] = 0.
+			np.divide(depth, travel, out=remaining[:, axis], where=crossing[:, axis])
+			np.minimum(remaining[:, axis], 1., out=remaining[:, axis])
+
+			depth *= restitution
+			np.subtract(wall, depth, out=p, where=crossing[:, axis])
+			np.clip(p, low, high, out=p)  # Restitution cannot send a point through the opposite wall
+			np.multiply(v, -restitution, out=v, where=crossing[:, axis])
+
+		# Single wall impacts : the tangent position goes back to the impact point, and the tangent velocity is voided
+		for axis, tangent in ((0, 1), (1, 0)):
+
+			single = np.logical_and(crossing[:, axis], np.logical_not(crossing[:, tangent], out=outside), out=outside)
+
+			if single.any():
+				np.multiply(self.v[:, tangent], dt, out=travel)
+				travel *= remaining[:, axis]
+				np.subtract(self.pos[:, tangent], travel, out=self.pos[:, tangent], where=single)
+				np.copyto(self.v[:, tangent], 0., where=single)
+
+
+	def surface(self) -> float:
+		"""Returns the surface of the object
+		Depending on whether the rotation direction of the points
+		is positive or not, S will be positive or negative.
+		To handle both cases : abs
+		"""
+
+		n = len(self.edge)
+		scratch = self.scratch
+
+		pt1 = np.take(self.pos, self.edge, axis=0, out=scratch.get("edge_pos", (n, 2), self.pos.dtype), mode="clip")
+
+		# Next point of the edge, for each point
+		pt2 = scratch.get("edge_next", (n, 2), self.pos.dtype)
+		pt2[:-1] = pt1[1:]
+		pt2[-1] = pt1[0]
+
+		# Surface of a trapèze
+		heights = np.add(pt2[:, 1], pt1[:, 1], out=scratch.get("edge_sum", (n,), self.pos.dtype))
+		widths = np.subtract(pt2[:, 0], pt1[:, 0], out=scratch.get("edge_difference", (n,), self.pos.dtype))
+		np.multiply(heights, widths, out=heights)
+		heights /= 2
+
+		S = np.sum(heights)
+
+		return abs(S)
+
+
+	def point_coordinates(self) -> np.ndarray:
+		"""Returns an array [(x,y), (x,y)] of the coordinates of every point
+		of the shape, ready to use for pygame.draw.polygon(window, color, points)
+		(only edge points)
+		"""
+		return self.pos[self.edge]
+
+	def gravity_forces(self, g : float=9.81):
+		"""Compute gravity forces for each point (see fields.Gravity, the default field of the World)
+		g = 9.81 m/s² : gravity acceleration
+		"""
+		Gravity(g).apply(self, self.f)
+
+
+	def field_forces(self):
+		"""Compute the forces of the external force fields (self.fields) for each point"""
+
+		for field in self.fields:
+			field.apply(self, self.f)
+
+
+	@staticmethod
+	def get_edge_points(width : int, height : int) -> np.ndarray:
+		"""Get edge point indices for a polygon defined in a precis order.
+		width, height : number of squares along the width, height of the object
+		(used by SpringyStructure, NetObject...).
+
+		ORDER : from left to right and bottom to top (j in range height, i in range width)
+		"""
+		rows, columns = height + 1, width + 1
+
+		return np.concatenate((
+			np.arange(columns),  # Bottom edge
+			np.arange(columns-1, columns*rows, columns),  # Right edge
+			np.arange(columns * rows-1, columns * (rows-1), -1),  # Top edge, from right to left
+			np.arange(columns*(rows-1), -columns,-columns),  # Left edge, from top to bottom
+		))
+
+
+	@staticmethod
+	def create_rectangle_shape(pos : Point, side : float, width : int, height : int) -> np.ndarray:
+		"""Create the (n, 2) positions array of a rectangle shape in the right order with the given params
+		Point i + j * columns is on column i and row j
+		"""
+
+		rows, columns = height + 1, width + 1
+
+		points = np.empty((rows * columns, 2))
+		points[:, 0] = np.tile(pos.x + np.arange(columns) * side, rows)
+		points[:, 1] = np.repeat(pos.y + np.arange(rows) * side, columns)
+
+		return points
+
+
+	@staticmethod
+	def grid_springs(width : int, height : int, di : int, dj : int, l0 : float, k : float, kd : float) -> SpringArray:
+		"""Creates the springs between every point (i, j) of a rectangle shape and its (i + di, j + dj) neighbour,
+		for every pair of points that are both in the shape.
+		The shape must have been created with Object.create_rectangle_shape()
+		"""
+		columns = width + 1
+
+		# Points (i, j) for which the neighbour is inside the shape
+		i = np.arange(max(0, -di), min(width + 1, width + 1 - di))
+		j = np.arange(max(0, -dj), min(height + 1, height + 1 - dj))
+
+		i1 = (i[None, :] + j[:, None] * columns).ravel()
+
+		return SpringArray(i1, i1 + di + dj * columns, l0, k, kd)
+
+
+	@staticmethod
+	def bending_springs(width : int, height : int, rows : int, side : float, k : float, kd : float) -> SpringArray:
+		"""Creates the bending springs of a rectangle shape : skip-one springs between every point (i, j)
+		and its (i + 2, j) and (i, j + 2) neighbours (rest length 2 * side)
+		rows : the horizontal springs are only created on the rows j <= rows
+		"""
+		return SpringArray.concatenate((
+			Object.grid_springs(width, rows, 2, 0, 2*side, k, kd),  # horizontal
+			Object.grid_springs(width, height, 0, 2, 2*side, k, kd),  # vertical
+		))
+
+
+## MAIN ABSTRACT SUBCLASSES
+
+class SoftObject(Object):
+	"""Soft Object class
+
+	Contains springs, and a method to take their forces into account
+
+	springs : main springs (drawn by the renderers)
+	shear, bending : additional spring sets, with their own parameters : shear springs (diagonals) and
+	bending springs (skip-one springs, between second neighbours). Each set is computed as a separate batch
+	"""
+
+
+	def __init__(self, pos : np.ndarray, m : np.ndarray, springs : SpringArray=None,
+		edge : np.ndarray = None, pinned : np.ndarray = None, shear : SpringArray=None, bending : SpringArray=None):
+
+
+		super().__init__(pos, m, edge, pinned)
+
+		self.springs = springs if springs is not None else SpringArray()  # Empty if springs is None
+		self.shear = shear if shear is not None else SpringArray()
+		self.bending = bending if bending is not None else SpringArray()
+
+		self.torn = False  # True once springs have broken (see tear_springs) : the edge is no longer an outline
+
+
+	def setPrecision(self, dtype, force_dtype=None):
+		"""Reimplementation of base class method : the spring parameters are converted as well"""
+
+		super().setPrecision(dtype, force_dtype)
+
+		for _, springs in self.spring_sets():
+			springs.astype(dtype)
+
+
+	def spring_sets(self) -> List[tuple]:
+		"""Returns the (name, SpringArray) spring sets : the main springs, then the shear and bending springs
+		if there are any. name prefixes the work arrays of the set (see scratch.py)
+		"""
+		sets = [("spring", self.springs)]
+
+		if len(self.shear):
+			sets.append(("shear", self.shear))
+		if len(self.bending):
+			sets.append(("bending", self.bending))
+
+		return sets
+
+
+	def addSpring(self, spring : Spring):
+
+		self.springs.append(spring)
+
+
+	@staticmethod
+	def compile_topology(points : np.ndarray, sets : dict, edge : np.ndarray, pinned : np.ndarray=None) -> dict:
+		"""Returns the arrays of a compiled topology (see topology.py) : rest positions, edge, pinned points,
+		and the index arrays, rest lengths and Scatter tables of each spring set (sets : name -> SpringArray)
+		"""
+		n = len(points)
+		arrays = {"points" : points, "edge" : edge, "pinned" : np.zeros(0, dtype=int) if pinned is None else pinned}
+
+		for name, springs in sets.items():
+
+			arrays[name + "_i1"], arrays[name + "_i2"], arrays[name + "_l0"] = springs.i1, springs.i2, springs.l0
+
+			for suffix, indices in (("_i1", springs.i1), ("_i2", springs.i2)):
+				for array, value in Scatter(indices, n).arrays().items():
+					arrays[name + suffix + "_" + array] = value
+
+		return arrays
+
+
+	@staticmethod
+	def compiled_springs(topology : dict, name : str, k : float, kd : float) -> SpringArray:
+		"""Returns a copy of the spring set name of a compiled topology, with stiffness k and damping kd
+		(None if the topology has no such set)
+		"""
+		if name + "_i1" not in topology:
+			return None
+
+		return SpringArray(np.array(topology[name + "_i1"]), np.array(topology[name + "_i2"]), topology[name + "_l0"], k, kd)
+
+
+	def restore_tables(self, topology : dict):
+		"""Sets the Scatter tables of the spring sets from a compiled topology (see compile_topology) :
+		they are not built at the first step
+		"""
+		n = len(self.pos)
+
+		for name, springs in self.spring_sets():
+			for suffix, indices in (("_i1", springs.i1), ("_i2", springs.i2)):
+
+				prefix = name + suffix + "_"
+
+				if prefix + "count" in topology:
+					arrays = {key[len(prefix):] : value for key, value in topology.items() if key.startswith(prefix)}
+					self.scratch.tables[name + suffix] = Scatter.restore(indices, n, arrays)
+
+
+	def setBreaking(self, breaking : float):
+		"""Make every spring of the object breakable : a spring breaks when its strain (length - l0) / l0
+		exceeds breaking (see tear_springs). np.inf : unbreakable springs
+		"""
+		for _, springs in self.spring_sets():
+			springs.setBreaking(breaking)
+
+
+	def tear_springs(self) -> int:
+		"""Called by the solvers at the end of each step
+
+		Removes the springs whose strain exceeds their breaking strain, and the edge points that are no longer
+		attached to any spring. Returns the number of broken springs
+		The strains of the breakable spring sets are checked in a vectorized pass ; each removal then costs O(1)
+		(swap-remove compaction of the spring arrays and of the Scatter tables, see scratch.py)
+		"""
+		scratch = self.scratch
+		n, dtype = len(self.pos), self.pos.dtype
+		broken = 0
+
+		for name, springs in self.spring_sets():
+
+			if not springs.breakable:
+				continue
+
+			count = len(springs)
+
+			def get(array : str, shape : tuple, dtype=dtype) -> np.ndarray:
+				return scratch.get(name + "_" + array, shape, dtype)
+
+			# Strain of each spring : |pt2 - pt1| / l0 - 1
+			pt1 = np.take(self.pos, springs.i1, axis=0, out=get("pt1", (count, 2)), mode="clip")
+			pt2 = np.take(self.pos, springs.i2, axis=0, out=get("pt2", (count, 2)), mode="clip")
+			vector = np.subtract(pt2, pt1, out=pt2)
+			np.multiply(vector, vector, out=vector)
+			strain = np.add(vector[:, 0], vector[:, 1], out=get("length", (count,)))
+			np.sqrt(strain, out=strain)
+			strain /= springs.l0
+			strain -= 1
+
+			over = np.greater(strain, springs.breaking, out=get("broken", (count,), bool))
+
+			if not over.any():
+				continue
+
+			indices = np.flatnonzero(over)
+			points = np.concatenate((springs.i1[indices], springs.i2[indices]))
+
+			# The Scatter tables (built at the first step) are patched rather than rebuilt
+			scratch.scatter(name + "_i1", springs.i1, n)
+			scratch.scatter(name + "_i2", springs.i2, n)
+
+			springs.swap_remove(indices, lambda spring, last: scratch.swap_remove(name, spring, last))
+			scratch.compacted(name, springs, points)
+
+			self.detach_edge(points)
+			broken += len(indices)
+
+		return broken
+
+
+	def detach_edge(self, points : np.ndarray):
+		"""Removes the given points from the edge if they are no longer attached to any spring (torn object)"""
+
+		self.torn = True
+
+		attached = np.zeros(len(points), dtype=bool)
+
+		for name, _ in self.spring_sets():
+			for suffix in ("_i1", "_i2"):
+				attached |= self.scratch.tables[name + suffix].count[points] > 0
+
+		detached = points[~attached]
+
+		if len(detached):
+			self.edge = self.edge[~np.isin(self.edge, detached)]
+
+
+	def spring_forces(self):
+		"""Called during update()
+
+		Calculates spring forces on every single point of the SoftObject, one batch per spring set
+		self.reset_forces() must be called beforehand
+		"""
+		for name, springs in self.spring_sets():
+			self.spring_set_forces(name, springs)
+
+
+	def spring_set_forces(self, name : str, springs : SpringArray):
+		"""Adds the forces of a spring set (see spring_sets) to self.f"""
+
+		scratch = self.scratch
+		n, count = len(self.pos), len(springs)
+		dtype = self.pos.dtype
+
+		def get(array : str, shape : tuple, dtype=dtype) -> np.ndarray:
+			return scratch.get(name + "_" + array, shape, dtype)
+
+		pt1 = np.take(self.pos, springs.i1, axis=0, out=get("pt1", (count, 2)), mode="clip")
+		pt2 = np.take(self.pos, springs.i2, axis=0, out=get("pt2", (count, 2)), mode="clip")
+
+		spring_vector = np.subtract(pt2, pt1, out=pt2)  # from pt1 to pt2
+
+		# Spring force
+		squares = np.multiply(spring_vector, spring_vector, out=pt1)
+		spring_length = np.add(squares[:, 0], squares[:, 1], out=get("length", (count,)))
+		np.sqrt(spring_length, out=spring_length)
+		spring_vector /= spring_length[:, None]
+
+		# f * spring_vector is the force vector applied on pt1
+		f = np.subtract(spring_length, springs.l0, out=get("force", (count,)))
+		np.multiply(springs.k, f, out=f)
+
+		# Damping force
+		v1 = np.take(self.v, springs.i1, axis=0, out=pt1, mode="clip")
+		rel_velocity = np.take(self.v, springs.i2, axis=0, out=get("velocity", (count, 2)), mode="clip")
+		np.subtract(rel_velocity, v1, out=rel_velocity)  # velocity vector, to be projected on spring_vector
+
+		np.multiply(rel_velocity, spring_vector, out=rel_velocity)
+		damping = np.add(rel_velocity[:, 0], rel_velocity[:, 1], out=spring_length)
+		damping *= springs.kd
+		f += damping
+
+		# Update forces : sum the contributions of every spring on each point
+		# (in the precision of the forces, with a zero row for the padding of the Scatter tables)
+		contributions = get("contributions", (count + 1, 2), self.f.dtype)
+		contributions[-1] = 0.
+		np.multiply(spring_vector, f[:, None], out=contributions[:-1])
+
+		total = get("total", (n, 2), self.f.dtype)
+		buffer = get("buffer", (n, 2), self.f.dtype)
+
+		scratch.scatter(name + "_i1", springs.i1, n).sum(contributions, total, buffer)
+		self.f += total
+		scratch.scatter(name + "_i2", springs.i2, n).sum(contributions, total, buffer)
+		self.f -= total
+
+
+## USABLE SUBCLASSES
+
+class SoftBall(SoftObject):
+	"""Soft ball class
+
+	A ball with springs along the side, and an internal pressure force
+
+	Parameters :
+	m : mass (kg)
+	r :  radius (m)
+	n : number of points
+
+	the mass is shared between each point
+	"""
+
+	def __init__(self, pos : Point, m : float, r : float, n : int, k : float, kd : float,
+		pressure_coeff : float, pressure_damping_coeff : float):
+
+		# Creating point arrays
+		points = SoftBall.init_ball_coordinates(r, n) + pos.pos
+		masses = np.full(n, m / n)  # the mass is shared between each point
+
+		# Creating springs along the side
+		i1 = np.arange(n)
+		i2 = (i1 + 1) % n
+		springs = SpringArray(i1, i2, np.sqrt(np.sum((points[i2] - points[i1])**2, 1)), k, kd)
+
+		# Initialize base SoftObject class
+		super().__init__(points, masses, springs)  # no edge -> edge points are set to all the points
+
+		# TODO : initialize pressure, and define a pressure calculation function
+
+		self.S0 = self.surface()  # initial surface
+		self.pressure_coeff = pressure_coeff
+		self.pressure_damp = pressure_damping_coeff
+
+		# pressure force : line_length * (1/V - 1/V0) * stiffness_coeff
+
+	@staticmethod
+	def init_ball_coordinates(r : float, n : int, angle_offset=0.) -> np.ndarray:
+		"""Returns the (n, 2) array of points coordinates that make a circle around the origin
+		Angle offset : so that 3 point or 4 point shape do not fall flat on
+		the ground upon starting the simulation, but slightly angled
+		"""
+
+		angles = 2*np.pi*np.arange(n)/n+angle_offset
+
+		return np.column_stack((r * np.cos(angles), r * np.sin(angles)))
+
+	def pressure_forces(self):
+		"""Calculate pressure forces on the side points of the Object"""
+
+		# Pressure to apply on every line of the Object
+		P = self.pressure_coeff * (1/self.surface() - 1/self.S0)
+
+		pos = self.pos
+
+		# Remark : in SoftBall, the points are listed in the positive direction of...
+		# ...rotation : the normal vectors (y, -x) of the sides point outwards
+
+		# Side vector, from each point to the next one
+		side_vector = self.scratch.get("side_vector", pos.shape, pos.dtype)
+		np.subtract(pos[1:], pos[:-1], out=side_vector[:-1])
+		np.subtract(pos[0], pos[-1], out=side_vector[-1])
+
+		# side_length * ext_vector = (y, -x) of the side vector
+		F = self.scratch.get("pressure_force", pos.shape, np.result_type(pos, P))
+		np.multiply(side_vector[:, 1], P, out=F[:, 0])
+		np.negative(side_vector[:, 0], out=F[:, 1])
+		F[:, 1] *= P
+
+		# The pressure force is shared between the 2 points
+		F /= 2
+		self.f += F
+
+		# Side i-1 -> i applies to point i as well
+		self.f[1:] += F[:-1]
+		self.f[0] += F[-1]
+
+
+	def pressure_damping_forces(self):
+		"""Pressure damping force between every point and the barycenter of the shape"""
+
+		barycentre = self.barycentre()  # Shape barycentre
+
+		n, dtype = len(self.pos), self.pos.dtype
+		scratch = self.scratch
+
+		# "spring" vectors, along which the damping force is applied
+		vector = np.subtract(barycentre.pos, self.pos, out=scratch.get("damping_vector", (n, 2), dtype))
+		squares = np.multiply(vector, vector, out=scratch.get("damping_buffer", (n, 2), dtype))
+		length = np.add(squares[:, 0], squares[:, 1], out=scratch.get("damping_force", (n,), dtype))
+		vector /= np.sqrt(length, out=length)[:, None]
+
+		# Projecting relative speed along the vector
+		rel_velocity = np.subtract(self.v, barycentre.v, out=squares)
+		np.multiply(vector, rel_velocity, out=rel_velocity)
+		f = np.add(rel_velocity[:, 0], rel_velocity[:, 1], out=length)
+		f *= self.pressure_damp
+
+		# The force applied goes in the opposite direction
+		self.f -= np.multiply(f[:, None], vector, out=vector)
+
+
+	def update(self, dt : float):
+		"""
+		Update the physics of the object over a dt time-step
+		"""
+
+		# Update forces
+
+		# Reset point forces to 0.
+		self.reset_forces()
+
+		# Calculate forces
+		self.spring_forces()
+		self.pressure_forces()
+		self.field_forces()
+		self.pressure_damping_forces()
+
+		# Update velocity and position for each point
+		self.update_points(dt)
+
+		# Do not forget to then call collision detection methods!
+
+
+class SpringyBox(SoftObject):
+	"""Spring box : jello-like appearance, only springs, 4 points
+
+	pos : starting position
+	m : total mass
+	r : "square radius" : the shape is generated using 4 points inside a circle
+	whose radius is r
+	k : spring stiffness
+	kd : spring damping coefficient
+
+	TODO : how to build structures made out of small cubes?
+	"""
+
+	def __init__(self, pos : Point, m : float, r : float, k : float, kd : float):
+
+		# Create points:
+		points = SoftBall.init_ball_coordinates(r, 4, 0.1) + pos.pos
+		masses = np.full(4, m / 4)
+
+		# Create springs along the side, then cross springs (diagonal length is 2r)
+		i1 = np.array([0, 1, 2, 3, 0, 1])
+		i2 = np.array([1, 2, 3, 0, 2, 3])
+		l0 = np.sqrt(np.sum((points[i2] - points[i1])**2, 1))
+		l0[4:] = 2*r
+
+		# Initialize base SoftObject class
+		super().__init__(points, masses, SpringArray(i1, i2, l0, k, kd))  # no edge : set to all the points by default
+
+
+	def update(self, dt : float):
+		"""Reimplementation of base class method"""
+
+		self.reset_forces()
+
+		self.spring_forces()
+		self.field_forces()
+		self.update_points(dt)
+
+
+
+class SpringyStructure(SoftObject):
+	"""SpringyStructure class:
+	A structure made of SpringyBoxes
+
+	=> springyboxes with parameters k, kd
+	pos : starting position : bottom left corner
+	m : total mass
+	side : length of any box'side
+	width, height : number of boxes aligned along the sides of the structure
+	shear_k : stiffness of the cross springs (N/m). None : they are main springs with stiffness k,
+	otherwise they form the separate shear spring set
+	bending_k : stiffness of the bending springs (N/m), that link every point to its second neighbours
+	horizontally and vertically (0 : no bending springs)
+	breaking : breaking strain of the springs (inf : unbreakable, see SoftObject.tear_springs)
+
+	"""
+
+	def __init__(self, pos, m : float, side : float, width : int, height : int, k : float, kd : float,
+		shear_k : float=None, bending_k : float=0., breaking : float=np.inf):
+
+		# Compiled topology (see topology.py), built once for a given geometry
+		separate_shear = shear_k is not None
+		topology = TOPOLOGY_CACHE.get(
+			("SpringyStructure", side, width, height, separate_shear, bool(bending_k)),
+			lambda: SpringyStructure.compile(side, width, height, separate_shear, bool(bending_k)))
+
+		points = topology["points"] + pos.pos
+		masses = np.full(len(points), m / len(points))
+
+		# Initialize base SoftObject class
+		super().__init__(points, masses, SoftObject.compiled_springs(topology, "spring", k, kd), np.array(topology["edge"]),
+			shear=SoftObject.compiled_springs(topology, "shear", shear_k, kd),
+			bending=SoftObject.compiled_springs(topology, "bending", bending_k, kd))
+
+		self.restore_tables(topology)
+		self.setBreaking(breaking)
+
+
+	@staticmethod
+	def compile(side : float, width : int, height : int, separate_shear : bool, bending : bool) -> dict:
+		"""Compiled topology of a SpringyStructure at (0, 0) (see SoftObject.compile_topology)"""
+
+		points = Object.create_rectangle_shape(Point(0, 0), side, width, height)
+
+		# Initialize springs :
+		# Cross springs, then horizontal and vertical springs
+		diagonal = np.sqrt(2)*side  # cross spring l0
+
+		cross = SpringArray.concatenate((
+			Object.grid_springs(width, height, 1, 1, diagonal, 0., 0.),  # bottom left to top right
+			Object.grid_springs(width, height, -1, 1, diagonal, 0., 0.),  # bottom right to top left
+		))
+		sets = {"spring" : SpringArray.concatenate((
+			SpringArray() if separate_shear else cross,
+			Object.grid_springs(width, height, 1, 0, side, 0., 0.),  # horizontal
+			Object.grid_springs(width, height, 0, 1, side, 0., 0.),  # vertical
+		))}
+
+		if separate_shear:
+			sets["shear"] = cross
+		if bending:
+			sets["bending"] = Object.bending_springs(width, height, height, side, 0., 0.)
+
+		return SoftObject.compile_topology(points, sets, Object.get_edge_points(width, height))
+
+
+	def update(self, dt : float):
+		"""Reimplementation of base class method, same as SpringyBox"""
+
+		self.reset_forces()
+
+		self.spring_forces()
+		self.field_forces()
+		self.update_points(dt)
+
+
+class NetObject(SoftObject):
+	"""
+	Simulates the behaviour of a piece of fabric
+
+	the top points are fixed (PINNED points)
+
+	shear_k : stiffness of the cross springs (N/m), a separate spring set (0 : no cross springs)
+	bending_k : stiffness of the skip-one bending springs (N/m), a separate spring set (0 : no bending springs)
+	breaking : breaking strain of the springs (inf : unbreakable, see SoftObject.tear_springs)
+
+	hint : display the shape's springs to appreciate it
+
+	CURRENT BUGS :
+	-> ça bouge pas, sûrement un problème dans une méthode qui n'a pas été redéfinie,
+	au niveau des points qui ne peuvent pas bouger, c'est bon
+
+	revoir la méthode update()
+
+	"""
+
+	def __init__(self, pos, m : float, side : float, width : int, height : int, k : float, kd : float,
+		shear_k : float=0., bending_k : float=0., breaking : float=np.inf):
+
+		# Compiled topology (see topology.py), built once for a given geometry
+		topology = TOPOLOGY_CACHE.get(
+			("NetObject", side, width, height, bool(shear_k), bool(bending_k)),
+			lambda: NetObject.compile(side, width, height, bool(shear_k), bool(bending_k)))
+
+		points = topology["points"] + pos.pos
+
+		super().__init__(
+			points,
+			np.full(len(points), m / len(points)),
+			springs=SoftObject.compiled_springs(topology, "spring", k, kd),
+			edge=np.array(topology["edge"]),
+			pinned=topology["pinned"],
+			shear=SoftObject.compiled_springs(topology, "shear", shear_k, kd),
+			bending=SoftObject.compiled_springs(topology, "bending", bending_k, kd)
+			)
+
+		self.restore_tables(topology)
+		self.setBreaking(breaking)
+
+
+	@staticmethod
+	def compile(side : float, width : int, height : int, shear : bool, bending : bool) -> dict:
+		"""Compiled topology of a NetObject at (0, 0) (see SoftObject.compile_topology)"""
+
+		points = Object.create_rectangle_shape(Point(0, 0), side, width, height)
+		sets = {"spring" : NetObject.create_net_springs(width, height, side, 0., 0.)}
+
+		# Optional spring sets : cross springs resist shearing, skip-one springs resist bending
+		# (the top layer is fixed : no horizontal bending springs between its points)
+		if shear:
+			diagonal = np.sqrt(2)*side
+
+			sets["shear"] = SpringArray.concatenate((
+				Object.grid_springs(width, height, 1, 1, diagonal, 0., 0.),
+				Object.grid_springs(width, height, -1, 1, diagonal, 0., 0.),
+			))
+
+		if bending:
+			sets["bending"] = Object.bending_springs(width, height, height - 1, side, 0., 0.)
+
+		return SoftObject.compile_topology(points, sets, Object.get_edge_points(width, height),
+			NetObject.get_pinned_points(width, height))
+
+
+	@staticmethod
+	def get_pinned_points(width : int, height : int) -> np.ndarray:
+		"""Returns the indices of the top layer points, which are fixed in the case of a NetObject
+		(the points are ordered like in Object.create_rectangle_shape())
+		"""
+
+		rows, columns = height + 1, width + 1
+
+		return np.arange((rows - 1) * columns, rows * columns)
+
+
+	@staticmethod
+	def create_net_springs(width : int, height : int, side : float, k : float, kd : float) -> SpringArray:
+		"""
+		Creates the shape's springs. A NetObject' springs are only vertical and horizontal
+		The top layer is fixed : no horizontal springs are created between its points
+		"""
+		return SpringArray.concatenate((
+			Object.grid_springs(width, height - 1, 1, 0, side, k, kd),  # horizontal : from point i to point i+1
+			Object.grid_springs(width, height, 0, 1, side, k, kd),  # vertical : from a point to the point on top
+		))
+
+	def update(self, dt : float):
+		"""Reimplementation of base class method, same as SpringyBox"""
+
+		self.reset_forces()
+
+		self.spring_forces()
+		self.field_forces()
+		self.update_points(dt)
@@ -0,0 +1,242 @@
+"""
+export.py
+
+Offline video export : the simulation is computed and drawn without any window,
+faster than real time, into an off-screen surface of any resolution.
+
+The frames are handed to a background writer thread over a bounded queue, so that
+physics and drawing never wait for the disk :
+* PNGWriter : writes a PNG image sequence (encoded with zlib, that releases the GIL)
+* PipeWriter : pipes raw RGB frames to a local encoder (ffmpeg_command() for ffmpeg)
+
+Example :
+	render = Render(100, 1024, 512)
+	render.addObject(...)
+	Exporter(render, (1920, 960), PNGWriter("frames")).run(600)
+"""
+import os
+import zlib
+import queue
+import struct
+import threading
+import subprocess
+import numpy as np
+from time import time
+from typing import List
+
+import pygame as pg
+
+from .render2D import Render
+
+
+class FrameWriter:
+	"""Base class of the background frame writers
+
+	size : (width, height) of the frames in pixels
+	maxsize : maximum number of frames waiting in the queue. When the writer
+	is too slow, write() waits for a free slot (bounded memory usage)
+	threads : number of writer threads (only for writers whose frames can be saved in any order)
+
+	Frames are raw RGB bytes. Subclasses implement save(index, frame) and finish()
+	"""
+
+	def __init__(self, size : tuple, maxsize : int=64, threads : int=1):
+
+		self.size = size
+		self.queue = queue.Queue(maxsize)
+		self.error : Exception = None  # Exception raised in a writer thread
+		self.count = 0  # Number of frames handed to the writer
+
+		self.threads = [threading.Thread(target=self.run, name="frame-writer", daemon=True) for _ in range(threads)]
+		for thread in self.threads:
+			thread.start()
+
+
+	def write(self, frame : bytes):
+		"""Hand a frame to the writer threads"""
+
+		if self.error is not None:
+			raise self.error
+
+		self.queue.put((self.count, frame))
+		self.count += 1
+
+
+	def close(self):
+		"""Wait until every frame is written"""
+
+		for thread in self.threads:
+			self.queue.put(None)  # End of the sequence, for each thread
+
+		for thread in self.threads:
+			thread.join()
+
+		try:
+			self.finish()
+		except Exception as error:
+			self.error = self.error or error
+
+		if self.error is not None:
+			raise self.error
+
+
+	def run(self):
+		"""Writer thread loop"""
+
+		while True:
+			item = self.queue.get()
+
+			if item is None:
+				break
+
+			if self.error is None:  # After an error, frames are dropped until close()
+				try:
+					self.save(*item)
+				except Exception as error:
+					self.error = error
+
+
+	def save(self, index : int, frame : bytes):
+		pass
+
+
+	def finish(self):
+		pass
+
+
+class PNGWriter(FrameWriter):
+	"""Writes the frames as a PNG image sequence : directory/frame_000000.png, ...
+
+	compression : zlib compression level (1 : fastest, 9 : smallest files)
+	threads : number of writer threads, the frames are encoded in parallel
+	"""
+
+	def __init__(self, directory : str, size : tuple=None, maxsize : int=64, threads : int=1,
+		compression : int=1, pattern : str="frame_{:06d}.png"):
+
+		self.directory = directory
+		self.pattern = pattern
+		self.compression = compression
+		os.makedirs(directory, exist_ok=True)
+
+		super().__init__(size, maxsize, threads)
+
+
+	def save(self, index : int, frame : bytes):
+
+		with open(os.path.join(self.directory, self.pattern.format(index)), "wb") as file:
+			file.write(encode_png(frame, self.size, self.compression))
+
+
+def encode_png(frame : bytes, size : tuple, compression : int=1) -> bytes:
+	"""Encode raw RGB bytes into a PNG file (8 bits RGB, no filter)"""
+
+	width, height = size
+
+	# Each row starts with its filter type (0 : no filter)
+	rows = np.zeros((height, 3 * width + 1), dtype=np.uint8)
+	rows[:, 1:] = np.frombuffer(frame, dtype=np.uint8).reshape(height, 3 * width)
+
+	def chunk(kind : bytes, data : bytes) -> bytes:
+		return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+	return b"".join((
+		b"\x89PNG\r\n\x1a\n",
+		chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+		chunk(b"IDAT", zlib.compress(rows.tobytes(), compression)),
+		chunk(b"IEND", b""),
+	))
+
+
+class PipeWriter(FrameWriter):
+	"""Pipes the raw RGB frames to the standard input of an encoder process
+
+	command : encoder command line, that reads rgb24 frames of the right size
+	on its standard input (see ffmpeg_command())
+	"""
+
+	def __init__(self, command : List[str], size : tuple=None, maxsize : int=64):
+
+		self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+		super().__init__(size, maxsize)  # A single thread : the frames must be written in order
+
+
+	def save(self, index : int, frame : bytes):
+
+		self.process.stdin.write(frame)
+
+
+	def finish(self):
+
+		self.process.stdin.close()
+
+		if self.process.wait() != 0:
+			raise RuntimeError("Encoder exited with code " + str(self.process.returncode))
+
+
+def ffmpeg_command(path : str, size : tuple, fps : float) -> List[str]:
+	"""ffmpeg command line that encodes raw rgb24 frames read on stdin into a video file"""
+
+	return [
+		"ffmpeg", "-y", "-loglevel", "error",
+		"-f", "rawvideo", "-pix_fmt", "rgb24",
+		"-s", "{}x{}".format(*size), "-r", str(fps),
+		"-i", "-",
+		"-pix_fmt", "yuv420p", path,
+	]
+
+
+class Exporter:
+	"""Offline export of a Render's simulation
+
+	render : Render whose world and display options (springs, normal vectors) are used
+	size : (width, height) of the exported frames in pixels. The scale is chosen
+	so that the whole container box fits in the frames
+	writer : FrameWriter that receives the frames. Its size is set by the Exporter
+	steps_per_frame : number of physics steps between two exported frames
+	(the video frame rate is render.fps / steps_per_frame)
+	"""
+
+	def __init__(self, render : Render, size : tuple, writer : FrameWriter, steps_per_frame : int=1):
+
+		self.render = render
+		self.size = size
+		self.writer = writer
+		self.writer.size = size
+		self.steps_per_frame = steps_per_frame
+
+		# Headless : no window is ever opened (set before pygame initializes its display, if it does)
+		os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+		world = render.world
+		self.scale = min(size[0] / (world.xmax - world.xmin), size[1] / (world.ymax - world.ymin))
+
+		self.surface = pg.Surface(size)  # Off-screen surface
+
+
+	@property
+	def fps(self) -> float:
+		"""Frame rate of the exported video"""
+		return self.render.fps / self.steps_per_frame
+
+
+	def run(self, frames : int) -> float:
+		"""Compute, draw and export the given number of frames
+		Returns the time spent (s)
+		"""
+		start = time()
+
+		try:
+			for _ in range(frames):
+
+				for _ in range(self.steps_per_frame):
+					self.render.world.step()
+
+				self.render.draw(self.surface, self.scale)
+
+				self.writer.write(pg.image.tobytes(self.surface, "RGB"))
+		finally:
+			self.writer.close()
+
+		return time() - start
@@ -0,0 +1,217 @@
+"""
+fields.py
+
+External force fields, registered on a World (World.addField)
+
+Each field adds its forces to the (n, 2) force array of an object, for all its points at once :
+a step costs one vectorized pass per field and per object. The temporaries are written into the
+object's work arrays (see scratch.py). Only the DYNAMIC points are subject to the fields.
+
+Gravity : uniform acceleration (the default field of a World)
+Wind : drag towards the wind velocity
+Attractor : radial acceleration towards (or away from) a center
+Vortex : tangential acceleration around a center
+GridField : acceleration sampled on a regular grid
+"""
+import numpy as np
+
+
+class ForceField:
+	"""Base class of the external force fields"""
+
+	def apply(self, obj, f : np.ndarray):
+		"""Adds the forces of the field on the points of obj (an Object) to f, a (n, 2) array"""
+		raise NotImplementedError
+
+
+class Gravity(ForceField):
+	"""Uniform gravity : f = m * g * direction
+
+	g : gravity acceleration (m/s²)
+	direction : unit vector, downwards by default
+	"""
+
+	def __init__(self, g : float=9.81, direction : tuple=(0., -1.)):
+
+		self.acceleration = [float(g * d) for d in direction]  # Python floats : they keep the precision of m
+
+	def apply(self, obj, f : np.ndarray):
+
+		weight = obj.scratch.get("gravity_weight", obj.m.shape, obj.m.dtype)
+		where = obj.where_dynamic(False)
+
+		for axis, acceleration in enumerate(self.acceleration):
+			if acceleration != 0.:
+				np.multiply(obj.m, acceleration, out=weight)
+				np.add(f[:, axis], weight, out=f[:, axis], where=where)
+
+
+class Wind(ForceField):
+	"""Wind : each point is dragged towards the wind velocity
+	f = drag * (velocity - v), or drag * |velocity - v| * (velocity - v) if quadratic
+
+	velocity : wind velocity (m/s)
+	drag : drag coefficient of a point (N/(m/s), or N/(m/s)² if quadratic)
+	"""
+
+	def __init__(self, velocity : tuple=(1., 0.), drag : float=0.1, quadratic : bool=False):
+
+		self.velocity = np.asarray(velocity, dtype=float)
+		self.drag = drag
+		self.quadratic = quadratic
+
+	def apply(self, obj, f : np.ndarray):
+
+		n = len(obj.pos)
+
+		relative = np.subtract(self.velocity, obj.v, out=obj.scratch.get("wind_velocity", (n, 2), obj.v.dtype))
+
+		if self.quadratic:
+			squares = np.multiply(relative, relative, out=obj.scratch.get("wind_buffer", (n, 2), obj.v.dtype))
+			speed = np.add(squares[:, 0], squares[:, 1], out=obj.scratch.get("wind_speed", (n,), obj.v.dtype))
+			relative *= np.sqrt(speed, out=speed)[:, None]
+
+		relative *= self.drag
+		np.add(f, relative, out=f, where=obj.where_dynamic())
+
+
+class Attractor(ForceField):
+	"""Radial attractor : acceleration strength * (center - pos) / (r² + softening²)^(3/2)
+	(inverse square law, softened near the center)
+
+	center : (x, y) position (m)
+	strength : (m³/s²), negative for a repulsor
+	softening : (m) distance under which the acceleration stops growing
+	"""
+
+	def __init__(self, center : tuple, strength : float=1., softening : float=0.1):
+
+		self.center = np.asarray(center, dtype=float)
+		self.strength = strength
+		self.softening = softening
+
+	def apply(self, obj, f : np.ndarray):
+
+		n, dtype = len(obj.pos), obj.pos.dtype
+
+		vector = np.subtract(self.center, obj.pos, out=obj.scratch.get("field_vector", (n, 2), dtype))
+		squares = np.multiply(vector, vector, out=obj.scratch.get("field_buffer", (n, 2), dtype))
+		factor = np.add(squares[:, 0], squares[:, 1], out=obj.scratch.get("field_factor", (n,), dtype))
+
+		# strength * m / (r² + softening²)^(3/2)
+		factor += self.softening**2
+		np.power(factor, -1.5, out=factor)
+		factor *= obj.m
+		factor *= self.strength
+
+		vector *= factor[:, None]
+		np.add(f, vector, out=f, where=obj.where_dynamic())
+
+
+class Vortex(ForceField):
+	"""Vortex : tangential acceleration strength * r / (r² + softening²) around the center,
+	counterclockwise if strength > 0
+
+	center : (x, y) position (m)
+	strength : (m²/s²)
+	softening : (m) radius of the vortex core, where the acceleration goes back to 0
+	"""
+
+	def __init__(self, center : tuple, strength : float=1., softening : float=0.1):
+
+		self.center = np.asarray(center, dtype=float)
+		self.strength = strength
+		self.softening = softening
+
+	def apply(self, obj, f : np.ndarray):
+
+		n, dtype = len(obj.pos), obj.pos.dtype
+
+		radius = np.subtract(obj.pos, self.center, out=obj.scratch.get("field_buffer", (n, 2), dtype))
+
+		# Tangent vector (-y, x), of norm r
+		tangent = obj.scratch.get("field_vector", (n, 2), dtype)
+		np.negative(radius[:, 1], out=tangent[:, 0])
+		tangent[:, 1] = radius[:, 0]
+
+		# strength * m / (r² + softening²)
+		np.multiply(radius, radius, out=radius)
+		factor = np.add(radius[:, 0], radius[:, 1], out=obj.scratch.get("field_factor", (n,), dtype))
+		factor += self.softening**2
+		np.divide(obj.m, factor, out=factor)
+		factor *= self.strength
+
+		tangent *= factor[:, None]
+		np.add(f, tangent, out=f, where=obj.where_dynamic())
+
+
+class GridField(ForceField):
+	"""Acceleration field sampled on a regular grid, bilinearly interpolated : f = m * a(pos)
+	Out of the grid, the acceleration of the nearest border is used
+
+	values : (rows, columns, 2) accelerations at the grid nodes (m/s²)
+	origin : (x, y) position of the node values[0, 0] (m)
+	spacing : (m) distance between two nodes : values[i, j] is at origin + (j, i) * spacing
+	"""
+
+	def __init__(self, values : np.ndarray, origin : tuple=(0., 0.), spacing : float=1.):
+
+		self.values = np.asarray(values, dtype=float)
+		self.origin = np.asarray(origin, dtype=float)
+		self.spacing = spacing
+
+		rows, columns, _ = self.values.shape
+		self.size = (columns, rows)  # Number of nodes along x, y
+		self.nodes = self.values.reshape(rows * columns, 2)
+
+	def apply(self, obj, f : np.ndarray):
+
+		n = len(obj.pos)
+		scratch = obj.scratch
+
+		# Position in the grid (in nodes), clamped to the grid
+		grid = np.subtract(obj.pos, self.origin, out=scratch.get("grid_position", (n, 2)))
+		grid /= self.spacing
+
+		# Bilinear weights along each axis, and index of the bottom left node
+		weight = scratch.get("grid_weight", (n, 2))
+		index = scratch.get("grid_index", (n,), np.int64)
+		cell = scratch.get("grid_cell", (n,), np.int64)
+		index.fill(0)
+
+		for axis, size in enumerate(self.size):
+
+			coordinate = grid[:, axis]
+			np.clip(coordinate, 0, size - 1, out=coordinate)
+
+			# Bottom left node, so that the top right node is in the grid
+			np.floor(coordinate, out=weight[:, axis])
+			np.minimum(weight[:, axis], max(size - 2, 0), out=weight[:, axis])
+			np.copyto(cell, weight[:, axis], casting="unsafe")
+
+			np.subtract(coordinate, weight[:, axis], out=weight[:, axis])
+
+			cell *= 1 if axis == 0 else self.size[0]
+			index += cell
+
+		complement = np.subtract(1., weight, out=scratch.get("grid_complement", (n, 2)))  # 1 - weight
+
+		acceleration = scratch.get("grid_acceleration", (n, 2))
+		sample = scratch.get("grid_sample", (n, 2))
+		factor = scratch.get("grid_factor", (n,))
+		acceleration.fill(0.)
+
+		# Sum of the 4 nodes values, weighted by (1 - wx or wx) * (1 - wy or wy)
+		for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+
+			offset = min(dx, self.size[0] - 1) + min(dy, self.size[1] - 1) * self.size[0]
+			np.add(index, offset, out=cell)
+			np.take(self.nodes, cell, axis=0, out=sample, mode="clip")
+
+			np.multiply((weight if dx else complement)[:, 0], (weight if dy else complement)[:, 1], out=factor)
+
+			sample *= factor[:, None]
+			acceleration += sample
+
+		acceleration *= obj.m[:, None]
+		np.add(f, acceleration, out=f, where=obj.where_dynamic())
@@ -0,0 +1,196 @@
+"""
+golden.py
+
+Golden-trajectory regression harness
+
+The trajectories of every preset (see presets.py), computed with the reference engine
+(default World : EulerSolver, serial, float64), are recorded in golden/<preset>.npz.
+Every other engine path is then checked against them : the first diverging step and object
+are reported, with configurable tolerances.
+
+ENGINES : name -> World options of each engine path to check
+PARALLEL_PRESETS : presets checked by default with the threaded engine path : the World only updates its
+objects in parallel when it has several of them, and the check fails if the thread pool was never used
+
+Command line :
+	python -m softbodies.golden record [presets...] [--steps N]
+	python -m softbodies.golden check [presets...] [--engine NAME] [--rtol R] [--atol A]
+"""
+import os
+import sys
+import argparse
+import numpy as np
+from typing import List
+
+from .presets import PRESETS, create_world
+
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+STEPS = 200  # Default number of recorded steps
+
+# Engine paths checked against the reference trajectories
+ENGINES = {
+	"reference" : {},
+	"threaded" : {"workers" : 4},
+	"float32" : {"dtype" : np.float32},
+	"float32_f64forces" : {"dtype" : np.float32, "force_dtype" : np.float64},
+}
+
+# Presets checked by default with the engine paths that need several objects
+PARALLEL_PRESETS = {
+	"threaded" : ["mixed"],
+}
+
+# Default (rtol, atol) of the engine paths that cannot match the reference to round-off
+TOLERANCES = {
+	"float32" : (1e-3, 1e-3),
+	"float32_f64forces" : (1e-3, 1e-3),
+}
+
+# Number of steps checked for the chaotic presets, with the engine paths of TOLERANCES : perturbing their initial
+# positions by 1e-7 m gives errors over 1e-3 m after about 50 (water_drop) and 120 (soft_polygon) steps,
+# so the rounding errors of those paths are only checked over their first steps
+CHAOTIC_STEPS = {
+	"water_drop" : 40,
+	"soft_polygon" : 100,
+}
+
+
+class SerialRun:
+	"""Failure of a multithreaded engine path whose World never created its thread pool (single-object scene)
+
+	preset, engine : names of the preset and of the engine path
+	"""
+
+	def __init__(self, preset : str, engine : str):
+
+		self.preset = preset
+		self.engine = engine
+
+	def __str__(self) -> str:
+		return "{} [{}] : the objects were never updated in parallel".format(self.preset, self.engine)
+
+
+class Divergence:
+	"""First step at which an engine path diverges from the reference trajectory
+
+	preset, engine : names of the preset and of the engine path
+	step : index of the step (0 : initial state)
+	object : index of the object in the world
+	error : maximum position error of the object (m)
+	"""
+
+	def __init__(self, preset : str, engine : str, step : int, object : int, error : float):
+
+		self.preset = preset
+		self.engine = engine
+		self.step = step
+		self.object = object
+		self.error = error
+
+	def __str__(self) -> str:
+		return "{} [{}] : diverges at step {}, object {} (error {:.3g} m)".format(
+			self.preset, self.engine, self.step, self.object, self.error)
+
+
+def golden_path(preset : str) -> str:
+	return os.path.join(GOLDEN_DIR, preset + ".npz")
+
+
+def simulate(world, steps : int) -> np.ndarray:
+	"""Returns the (steps + 1, points, 2) positions of every point of a world at each step"""
+
+	positions = [np.concatenate([obj.pos for obj in world.objectList])]
+
+	for _ in range(steps):
+		world.step()
+		positions.append(np.concatenate([obj.pos for obj in world.objectList]))
+
+	return np.array(positions, dtype=float)
+
+
+def record(preset : str, steps : int=STEPS):
+	"""Record the reference trajectory of a preset"""
+
+	world = create_world(preset)
+	offsets = np.cumsum([0] + [len(obj.pos) for obj in world.objectList])
+
+	try:
+		positions = simulate(world, steps)
+	finally:
+		world.close()
+
+	os.makedirs(GOLDEN_DIR, exist_ok=True)
+	np.savez_compressed(golden_path(preset), positions=positions, offsets=offsets)
+
+
+def check(preset : str, engine : str="reference", rtol : float=None, atol : float=None):
+	"""Check an engine path against the reference trajectory of a preset
+	A position diverges when |position - reference| > atol + rtol * |reference|
+	rtol, atol : TOLERANCES of the engine path by default, or (1e-7, 1e-9)
+	The trajectories are compared over CHAOTIC_STEPS steps for the chaotic presets with the engine paths of TOLERANCES
+	Returns the first Divergence, or None if the trajectories match
+	(or a SerialRun if a multithreaded engine path never created its thread pool)
+	"""
+	default_rtol, default_atol = TOLERANCES.get(engine, (1e-7, 1e-9))
+	rtol = default_rtol if rtol is None else rtol
+	atol = default_atol if atol is None else atol
+
+	golden = np.load(golden_path(preset))
+	reference, offsets = golden["positions"], golden["offsets"]
+
+	if engine in TOLERANCES and preset in CHAOTIC_STEPS:
+		reference = reference[:CHAOTIC_STEPS[preset] + 1]
+
+	options = ENGINES[engine]
+	world = create_world(preset, **options)
+
+	try:
+		positions = simulate(world, len(reference) - 1)
+		serial = options.get("workers", 1) > 1 and world.pool is None
+	finally:
+		world.close()
+
+	error = np.abs(positions - reference)
+	diverging = np.any(~(error <= atol + rtol * np.abs(reference)), 2)  # Also catches nan
+
+	if not diverging.any():
+		return SerialRun(preset, engine) if serial else None
+
+	step, point = np.argwhere(diverging)[0]
+	obj = np.searchsorted(offsets, point, side="right") - 1
+
+	return Divergence(preset, engine, step, obj, np.nanmax(error[step, offsets[obj]:offsets[obj + 1]]))
+
+
+def main(args : List[str]=None) -> int:
+
+	parser = argparse.ArgumentParser(description="Golden-trajectory regression harness")
+	parser.add_argument("command", choices=("record", "check"))
+	parser.add_argument("presets", nargs="*", help="presets to record or check (all by default, see PARALLEL_PRESETS)")
+	parser.add_argument("--steps", type=int, default=STEPS, help="number of recorded steps")
+	parser.add_argument("--engine", action="append", choices=list(ENGINES), help="engine paths to check (all by default)")
+	parser.add_argument("--rtol", type=float, help="relative tolerance (default : depends on the engine path)")
+	parser.add_argument("--atol", type=float, help="absolute tolerance (m) (default : depends on the engine path)")
+	args = parser.parse_args(args)
+
+	if args.command == "record":
+		for preset in args.presets or list(PRESETS):
+			record(preset, args.steps)
+			print("recorded", preset)
+		return 0
+
+	failures = 0
+	for engine in args.engine or list(ENGINES):
+		for preset in args.presets or PARALLEL_PRESETS.get(engine, list(PRESETS)):
+
+			divergence = check(preset, engine, args.rtol, args.atol)
+			window = " (first {} steps)".format(CHAOTIC_STEPS[preset]) if engine in TOLERANCES and preset in CHAOTIC_STEPS else ""
+			print(divergence or "{} [{}] : ok{}".format(preset, engine, window))
+			failures += divergence is not None
+
+	return 1 if failures else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+picking.py
+
+Spatial index over all the points of a World, for point picking (mouse grab) and radius queries
+
+The index is a sparse uniform grid : the points are sorted by cell, so that the points of a cell,
+and of a row of cells, are contiguous. Only the occupied cells are stored : the cell size follows
+the spacing of the points inside the objects, not the size of the whole scene.
+A query only reads the few cells around the queried point.
+
+The index is rebuilt lazily, at the second query of the same state of the world : building it (sorting all the
+points) costs about 10 times a vectorized scan of every point, so the first query after a step (a mouse click
+in the viewer, which steps the world every frame) scans the points of each object instead.
+
+Containment queries (contains) test many points against the outlines of every object at once : the bounding
+boxes of the outlines, cached until the next step of the world, reject most of the (point, object) pairs first.
+"""
+import numpy as np
+from typing import List, Tuple
+
+from .elements import Point, Object, DYNAMIC
+
+
+class PickingIndex:
+	"""Uniform grid over the points of every object of a world
+
+	world : the indexed World
+	points_per_cell : average number of points per occupied cell, sets the cell size
+
+	Queries return (object, point index) pairs
+	"""
+
+	def __init__(self, world, points_per_cell : float=4.):
+
+		self.world = world
+		self.points_per_cell = points_per_cell
+
+		self.version = None  # (steps, number of objects) of the world when the index was built
+		self.queried = None  # Same, at the last query answered without the index
+		self.boxes_version = None  # Same, when the bounding boxes of the outlines were computed
+
+
+	def invalidate(self):
+		"""Force a rebuild at the next query (positions changed outside of a world step)"""
+		self.version = None
+		self.queried = None
+		self.boxes_version = None
+
+
+	def update(self) -> bool:
+		"""Rebuild the index if the world has changed since the last build, and has already been queried
+		in its current state. Returns False if the index is out of date : the query scans every point
+		"""
+		version = (self.world.steps, len(self.world.objectList))
+
+		if version == self.version:
+			return True
+
+		if version != self.queried:
+			self.queried = version
+			return False
+
+		self.build()
+		self.version = version
+
+		return True
+
+
+	def build(self):
+		"""Sort all the points of the world by grid cell"""
+
+		objects = self.world.objectList
+		sizes = [len(obj.pos) for obj in objects]
+		count = sum(sizes)
+
+		pos = np.concatenate([obj.pos for obj in objects]) if count else np.zeros((0, 2))
+		owner = np.repeat(np.arange(len(objects)), sizes)  # Index of the object of each point
+		offsets = np.cumsum([0] + sizes)
+		dynamic = np.concatenate([obj.state == DYNAMIC for obj in objects]) if count else np.zeros(0, dtype=bool)
+
+		# Grid dimensions
+		self.low = pos.min(0) if count else np.zeros(2)
+		extent = np.maximum(pos.max(0) - self.low, 1e-9) if count else np.ones(2)
+		self.cell = max(self.spacing(objects) * np.sqrt(self.points_per_cell), extent.max() * 1e-6)
+		self.nx, self.ny = (extent // self.cell).astype(np.int64) + 1
+
+		cells = self.cells_of(pos)
+		order = np.argsort(cells, kind="stable")
+		cells = cells[order]
+
+		self.pos = pos[order]
+		self.owner = owner[order]
+		self.index = (np.arange(count) - offsets[owner])[order]
+		self.dynamic = dynamic[order]
+
+		# Occupied cells : the points of the cell self.keys[k] are self.start[k]:self.start[k + 1]
+		self.keys, self.start = np.unique(cells, return_index=True)
+		self.start = np.append(self.start, count)
+
+
+	@staticmethod
+	def spacing(objects : List[Object]) -> float:
+		"""Typical distance between the points of an object (median over the points)"""
+
+		spacings, weights = [], []
+
+		for obj in objects:
+			if len(obj.pos) > 1:
+				extent = np.ptp(obj.pos, 0)
+				spacings.append(np.sqrt(max(np.prod(extent), extent.max()**2 / len(obj.pos)) / len(obj.pos)))
+				weights.append(len(obj.pos))
+
+		if not spacings:
+			return 1.
+
+		order = np.argsort(spacings)
+		median = np.searchsorted(np.cumsum(np.array(weights)[order]), sum(weights) / 2)
+
+		return max(spacings[order[median]], 1e-9)
+
+
+	def cells_of(self, pos : np.ndarray) -> np.ndarray:
+		"""Cell index of each position (clamped to the grid)"""
+
+		cx, cy = self.cell_coordinates(pos)
+		return cx + cy * self.nx
+
+
+	def cell_coordinates(self, pos : np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		"""Cell (column, row) of each position (clamped to the grid)"""
+
+		c = ((pos - self.low) // self.cell).astype(np.int64)
+		return np.clip(c[..., 0], 0, self.nx - 1), np.clip(c[..., 1], 0, self.ny - 1)
+
+
+	def square(self, cx : int, cy : int, r : int) -> np.ndarray:
+		"""Indices (in the sorted arrays) of the points of the cells at distance r or less from cell (cx, cy)
+		(square of cells, clipped to the grid). Each row of cells is a contiguous run of points
+		"""
+		x0, x1 = max(cx - r, 0), min(cx + r, self.nx - 1)
+		rows = np.arange(max(cy - r, 0), min(cy + r, self.ny - 1) + 1) * self.nx
+
+		# Occupied cells of each row of the square, then their points
+		first = self.start[np.searchsorted(self.keys, rows + x0)]
+		end = self.start[np.searchsorted(self.keys, rows + x1 + 1)]
+		lengths = end - first
+
+		# Concatenation of the ranges first:end
+		return np.repeat(first - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+	def nearest(self, point : Point, dynamic_only : bool=True) -> Tuple[Object, int]:
+		"""Returns the (object, point index) pair of the point nearest to the given point,
+		or None if there is no point
+		dynamic_only : only look for DYNAMIC points (points that can be grabbed)
+		"""
+		if not self.update():
+			return self.scan_nearest(point, dynamic_only)
+
+		cx, cy = self.cell_coordinates(point.pos)
+		r = 0
+
+		# Search squares of cells of growing size, until the nearest point found
+		# is closer than any point out of the square (at least r cells away)
+		while True:
+
+			candidates = self.square(cx, cy, r)
+			if dynamic_only:
+				candidates = candidates[self.dynamic[candidates]]
+
+			whole_grid = r >= max(self.nx, self.ny)
+
+			if len(candidates) > 0:
+
+				distances = np.sum((self.pos[candidates] - point.pos)**2, 1)
+				best = candidates[np.argmin(distances)]
+
+				if whole_grid or distances.min() <= (r * self.cell)**2:
+					break
+
+			elif whole_grid:
+				return None
+
+			r = max(1, 2 * r)
+
+		return self.world.objectList[self.owner[best]], self.index[best]
+
+
+	def within(self, point : Point, radius : float, dynamic_only : bool=False) -> List[Tuple[Object, int]]:
+		"""Returns the (object, point index) pairs of every point closer than radius to the given point"""
+
+		if not self.update():
+			return self.scan_within(point, radius, dynamic_only)
+
+		cx, cy = self.cell_coordinates(point.pos)
+		candidates = self.square(cx, cy, int(radius // self.cell) + 1)
+
+		inside = np.sum((self.pos[candidates] - point.pos)**2, 1) <= radius**2
+		if dynamic_only:
+			inside &= self.dynamic[candidates]
+
+		candidates = candidates[inside]
+
+		return [(self.world.objectList[o], i) for o, i in zip(self.owner[candidates], self.index[candidates])]
+
+
+	def scan_distances(self, obj : Object, point : Point, dynamic_only : bool) -> np.ndarray:
+		"""Squared distances of the points of an object to the given point (inf for the points that are not
+		dynamic if dynamic_only), without the index
+		"""
+		vector = obj.pos - point.pos
+		distances = np.einsum("ij,ij->i", vector, vector)
+
+		if dynamic_only:
+			distances[obj.state != DYNAMIC] = np.inf
+
+		return distances
+
+
+	def scan_nearest(self, point : Point, dynamic_only : bool=True) -> Tuple[Object, int]:
+		"""Same as nearest, by scanning every point"""
+
+		best, best_distance = None, np.inf
+
+		for obj in self.world.objectList:
+			if len(obj.pos):
+
+				distances = self.scan_distances(obj, point, dynamic_only)
+				i = np.argmin(distances)
+
+				if distances[i] < best_distance:
+					best, best_distance = (obj, i), distances[i]
+
+		return best
+
+
+	def scan_within(self, point : Point, radius : float, dynamic_only : bool=False) -> List[Tuple[Object, int]]:
+		"""Same as within, by scanning every point"""
+
+		return [(obj, i) for obj in self.world.objectList
+			for i in np.flatnonzero(self.scan_distances(obj, point, dynamic_only) <= radius**2)]
+
+
+	def bounding_boxes(self) -> np.ndarray:
+		"""Returns the (number of objects, 4) array of the (xmin, ymin, xmax, ymax) bounding boxes of the outlines
+		of the objects (edge points), computed once per step of the world
+		"""
+		version = (self.world.steps, len(self.world.objectList))
+
+		if version != self.boxes_version:
+
+			self.boxes = np.full((len(self.world.objectList), 4), np.nan)  # nan : rejects every point
+
+			for box, obj in zip(self.boxes, self.world.objectList):
+				if len(obj.edge):
+					outline = obj.pos[obj.edge]
+					box[:2], box[2:] = outline.min(0), outline.max(0)
+
+			self.boxes_version = version
+
+		return self.boxes
+
+
+	def contains(self, points : np.ndarray) -> np.ndarray:
+		"""Returns the (M, number of objects) boolean array of the given (M, 2) points that are inside
+		the outline of each object of the world : inside[i, k] for points[i] and the k-th object (see Object.contains)
+		"""
+		points = np.asarray(points, dtype=float).reshape(-1, 2)
+		objects = self.world.objectList
+		boxes = self.bounding_boxes()
+
+		# Early rejection : (point, object) pairs out of the bounding box
+		candidates = np.all((points[:, None] >= boxes[:, :2]) & (points[:, None] <= boxes[:, 2:]), axis=2)
+		inside = np.zeros((len(points), len(objects)), dtype=bool)
+
+		for k in np.flatnonzero(candidates.any(0)):
+
+			indices = np.flatnonzero(candidates[:, k])
+			inside[indices, k] = objects[k].contains(points[indices])
+
+		return inside
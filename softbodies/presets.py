@@ -0,0 +1,163 @@
+"""
+presets.py
+
+Working presets : scenes whose coefficients are known to be stable at the given fps
+
+PRESETS : name -> (fps, build), build() returns the list of objects of the scene
+The scenes are simulated in a 10.24 x 5.12 m box (1024 x 512 window, 100 pixels per meter)
+
+# If shape is unstable, increase inertia by increasing mass
+# this means that the k / m ratio cannot exceed a certain value because
+# of sampling effect. Python might be too slow in order to be able to
+# increase FPS
+
+Position-based engine :
+# World(..., solver=XPBDSolver(substeps=4, iterations=5))
+# XPBD is unconditionally stable : the presets can be run at 60 fps whatever k / m,
+# add substeps or iterations to make the objects stiffer
+"""
+from typing import List
+
+from .elements import Point, Object, SoftBall, SpringyBox, SpringyStructure, NetObject
+from .world import World
+
+
+XMAX, YMAX = 10.24, 5.12  # Container box of the presets (m)
+
+
+def water_drop() -> List[Object]:
+	"""A water-drop-like ball. There are still issues with grabbing the shape, as it creates
+	a stress on the shape that is too high to be stable
+	"""
+	return [SoftBall(
+		Point(4, 1),  # Center point
+		5,  # Total mass (kg)
+		0.5,  # Ball radius (m)
+		50,  # Number of points
+		40,  # spring stiffness
+		0.1,  # spring damping coefficient
+		60,  # Pressure coeff
+		0.2)]  # Pressure damping coeff
+
+
+def soft_polygon() -> List[Object]:
+	"""A soft polygon, less glitchy than the previous preset"""
+	return [SoftBall(
+		Point(4, 1),  # Center point
+		1,  # Total mass (kg)
+		0.5,  # Ball radius (m)
+		10,  # Number of points
+		40,  # spring stiffness
+		0.1,  # spring damping coefficient
+		60,  # Pressure coeff
+		0.2)]  # Pressure damping coeff
+
+
+def jelly_box() -> List[Object]:
+	"""A jelly like square. kd = 0.05 for a much springier box"""
+	return [SpringyBox(
+		Point(2, 2),  # Starting position
+		0.1,  # Total mass
+		0.5,  # Radius
+		7,  # k
+		0.2)]  # kd
+
+
+def jelly_block() -> List[Object]:
+	"""A vertical block of jelly
+	Issue : with 30 FPS, k cannot be raised too much, else the shape is unstable
+	"""
+	return [SpringyStructure(
+		Point(1, 1),
+		1.,
+		0.5,
+		2,
+		3,
+		30,
+		0.2
+	)]
+
+
+def stiff_jelly_block() -> List[Object]:
+	"""Same shape, with 100 fps instead of 30 (else, unstable)"""
+	return [SpringyStructure(
+		Point(1, 1),
+		1.,
+		0.5,
+		2,
+		5,
+		200,
+		0.4
+	)]
+
+
+def stiff_ball() -> List[Object]:
+	"""Same SoftBall with 100 fps : stiffness can be increased, and the result is much better"""
+	return [SoftBall(
+		Point(4, 1),  # Center point
+		1,  # Total mass (kg)
+		0.5,  # Ball radius (m)
+		50,  # Number of points
+		100,  # spring stiffness
+		0.2,  # spring damping coefficient
+		100,  # Pressure coeff
+		0.2,  # Pressure damping coeff
+	)]
+
+
+def small_jelly_block() -> List[Object]:
+	"""At least 200 fps"""
+	return [SpringyStructure(
+		Point(1, 1),
+		1.,
+		0.2,
+		2,
+		5,
+		400,
+		0.4
+	)]
+
+
+def net() -> List[Object]:
+	"""WARNING : when adding rows / columns, each point's mass decreases. Make sure to decrease k by the same factor"""
+	return [NetObject(
+		pos=Point(1, 1),
+		m=1.,
+		side=0.6,
+		width=12,
+		height=4,
+		k=5,
+		kd=1.
+	)]
+
+
+def mixed() -> List[Object]:
+	"""The objects of several presets in the same box, at 200 fps (the World can update them in parallel)"""
+	return small_jelly_block() + net() + stiff_ball() + jelly_box()
+
+
+PRESETS = {
+	"water_drop" : (30, water_drop),
+	"soft_polygon" : (30, soft_polygon),
+	"jelly_box" : (30, jelly_box),
+	"jelly_block" : (30, jelly_block),
+	"stiff_jelly_block" : (100, stiff_jelly_block),
+	"stiff_ball" : (100, stiff_ball),
+	"small_jelly_block" : (200, small_jelly_block),
+	"net" : (200, net),
+	"mixed" : (200, mixed),
+}
+
+
+def create_world(name : str, **options) -> World:
+	"""Create a World that contains the objects of a preset, at the preset's time step
+	options : other World parameters (solver, workers...)
+	"""
+	fps, build = PRESETS[name]
+
+	world = World(1 / fps, 0., XMAX, 0., YMAX, **options)
+
+	for obj in build():
+		world.addObject(obj)
+
+	return world
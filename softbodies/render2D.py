@@ -0,0 +1,419 @@
+"""
+render2D.py
+
+Rendering class using pygame
+Only the viewer loads pygame : the physics core (world.py) does not depend on it
+
+"""
+import numpy as np
+import pygame as pg
+from .elements import Point, Object, SoftObject
+from .math_func import rescale, pixel_to_coord
+from .world import World
+from .diagnostics import FIELDS
+import sys
+from typing import List
+from time import time
+from statistics import mean
+
+
+# Default values that work well
+
+
+# Screen size
+SIZE_X, SIZE_Y = 640, 480
+FPS = 30
+SCALE = 100  # pixels per meter
+
+# Colors :
+blue = pg.Color(0, 0, 255)  # Shape color
+white = pg.Color(255, 255, 255)  # Background color
+red = pg.Color(255, 0, 0)  # Spring color
+black = pg.Color(0, 0, 0)  # Normal vector color
+
+
+
+
+def draw_sparkline(window : pg.Surface, values : np.ndarray, rect : pg.Rect, color : pg.Color):
+	"""Draw a small line chart of values inside rect, scaled to the values range"""
+
+	values = values[np.isfinite(values)]
+	if len(values) < 2:
+		return
+
+	low, high = values.min(), values.max()
+	span = high - low if high > low else 1.
+
+	x = rect.left + np.arange(len(values)) * (rect.width - 1) / (len(values) - 1)
+	y = rect.bottom - 1 - (values - low) * (rect.height - 1) / span
+
+	pg.draw.rect(window, color, rect, 1)
+	pg.draw.lines(window, color, False, np.column_stack((x, y)).tolist())
+
+
+class Render:
+	"""Render class:
+	
+	Contains all necessary information and methods in order to render the simulation
+	The physics are computed by a World, whose container box is the window
+
+	solver : engine used by the World (see solvers.py), EulerSolver by default
+
+	The pygame events are turned into input events, applied by handle() (see session.py) :
+	they are written by the recorder (a SessionRecorder, None by default) to be replayed without display
+	"""
+
+	# Display options toggled by the keys (AZERTY : A, Z, R, E)
+	KEYS = {pg.K_q : "display_normal", pg.K_w : "display_springs", pg.K_r : "display_diagnostics", pg.K_e : "monitor_fps"}
+
+	def __init__(self, fps : int=FPS, size_x : int=SIZE_X, size_y : int=SIZE_Y, scale : int=SCALE, solver=None):
+
+		self.fps = fps
+		self.dt = 1/fps  # Simulation time step
+
+		# Screen size : pixel number along x,y axis
+		self.size_x = size_x
+		self.size_y = size_y
+		self.scale = scale  # Pixels per meter
+
+		# x,y axis maximum
+		self.xmax = size_x / scale
+		self.ymax = size_y / scale
+
+		self.xmin, self.ymin = 0., 0.  # Default minimum is zero : simplest option
+
+		self.world = World(self.dt, self.xmin, self.xmax, self.ymin, self.ymax, solver)
+		self.objectList : List[Object] = self.world.objectList  # Shared with the world
+
+		self.grabbed_object : Object = None  # Grabbed object whose point must be moved
+
+		# Display spring, normal
+		self.display_normal = False
+		self.display_springs = False
+		
+		# Display max fps available based on frames computing time
+		self.monitor_fps = False
+		self.monitor_period = 1.  # (seconds) : time between each fps update
+
+		# Display a sparkline of the world's total energy (needs self.world.diagnostics)
+		self.display_diagnostics = False
+
+		self.frame = 0  # Index of the current frame
+		self.mouse = (0, 0)  # Cursor position (pixels)
+		self.recorder = None  # SessionRecorder of the input events (see session.py)
+
+	
+	def setBoundaries(self, xmax : float, ymax : float):
+		"""Set container box boundaries, limited by screen size"""
+		
+		scale_x = self.size_x // xmax
+		scale_y = self.size_y // ymax
+
+		# In order to fit both axis, even though they might not have the same dimensions
+		# as the screen, the minimum scale must be picked
+		self.scale = min(scale_x, scale_y)
+
+
+	def addObject(self, object : Object):
+		"""Add an object before starting simulation"""
+		self.world.addObject(object)
+
+
+	def getClosestObject(self, point : Point) -> Object:
+		"""
+		Get the object that owns the dynamic point which is the closest to the point
+		(using the world's picking index)
+		"""
+		picked = self.world.picking.nearest(point)
+
+		return None if picked is None else picked[0]
+
+
+	def grab(self, mouse_pos : Point):
+		"""Left click : grab the dynamic point nearest to the cursor"""
+
+		# Set a point to be the "grabbed point"
+		# The "grabbed point" is KINEMATIC : ignored by its shape "update"
+		# It is only moved by computeGrabbedPoint
+
+		# Bring the object that owns the nearest point near the cursor
+		picked = self.world.picking.nearest(mouse_pos)
+		if picked is not None:
+
+			# The nearest point's state is changed to "grabbed point"
+			self.grabbed_object, i = picked
+			self.grabbed_object.grabPoint(i)
+
+
+	def release(self):
+		"""Left click released : release the grabbed point"""
+
+		if self.grabbed_object is not None:
+			self.grabbed_object.releaseGrabbedPoint()
+		self.grabbed_object = None
+
+
+	def drag(self, mouse_pos : Point):
+		"""Called at each frame with the cursor position : moves the grabbed point"""
+
+		if self.grabbed_object is not None:
+			self.grabbed_object.computeGrabbedPoint(mouse_pos, self.dt)
+
+
+	def cursor(self) -> Point:
+		"""Cursor position in x,y float coordinates"""
+
+		return Point(*pixel_to_coord(self.mouse, self.scale, self.ymax))
+
+
+	def handle(self, event : tuple):
+		"""Applies an input event (see session.py) : ("down", x, y) grab, ("up",) release,
+		("move", x, y) cursor position (pixels), ("toggle", option) display option
+		"""
+		kind = event[0]
+
+		if kind == "down":
+			self.grab(Point(*pixel_to_coord(event[1:], self.scale, self.ymax)))
+
+		elif kind == "up":
+			self.release()
+
+		elif kind == "move":
+			self.mouse = event[1:]
+
+		elif kind == "toggle":
+			setattr(self, event[1], not getattr(self, event[1]))
+
+
+	def update(self):
+		"""Called at each frame : update the objects physics"""
+
+		self.world.step()
+
+
+	def draw(self, window : pg.Surface, scale : float=None):
+		"""Draw the objects on a surface : the window, or an off-screen surface
+		scale : pixels per meter (self.scale by default), the y axis starts at the bottom of the surface
+		"""
+		scale = scale or self.scale
+		size_y = window.get_height()
+
+		# Clear screen
+		window.fill(white)
+
+		for obj in self.objectList:
+
+			# A torn object has no outline : it is drawn with its springs and its remaining edge points
+			torn = isinstance(obj, SoftObject) and obj.torn
+
+			if not torn:
+				pg.draw.polygon(window, blue, rescale(obj.point_coordinates(), scale, size_y))
+
+
+			if self.display_normal:
+				# Displaying normal vectors (on top of the shape)
+				pt1, pt2 = obj.pos, np.roll(obj.pos, -1, 0)
+
+				# Center position of each side
+				centers = (pt1 + pt2)/2
+
+				# Point in the side's normal direction, 1 meter farther
+				side_vectors = pt2 - pt1
+				side_vectors /= np.sqrt(np.sum(side_vectors**2, 1))[:, None]
+				normal_points = centers + np.column_stack((side_vectors[:, 1], -side_vectors[:, 0]))
+
+				# 2D x,y coordinates to position on screen
+				centers = rescale(centers, scale, size_y)
+				normal_points = rescale(normal_points, scale, size_y)
+
+				# Drawing the 1 meter long vectors
+				for center, normal_point in zip(centers, normal_points):
+					pg.draw.line(window, black, center, normal_point)
+
+
+			if isinstance(obj, SoftObject) and (self.display_springs or torn):  # Has springs & display
+
+				# Get the coordinates of the springs' edge points, rescaled to the screen display size
+				pts1 = rescale(obj.pos[obj.springs.i1], scale, size_y)
+				pts2 = rescale(obj.pos[obj.springs.i2], scale, size_y)
+
+				for pt1, pt2 in zip(pts1, pts2):
+
+					# Draw spring :
+					pg.draw.line(window, red, pt1, pt2, 2)  # Line size = 2 : thicker
+
+			if torn:
+				# Points of the edge still attached to a spring (see SoftObject.detach_edge), on top of the springs
+				for point in rescale(obj.pos[obj.edge], scale, size_y):
+					pg.draw.circle(window, blue, point, 3)
+
+
+	def draw_frame(self, window : pg.Surface):
+		"""Draw the objects, and the energy sparkline if it is displayed"""
+
+		self.draw(window)
+
+		if self.display_diagnostics and self.world.diagnostics is not None:
+			# Total energy of the world, in the top right corner
+			energy = self.world.diagnostics.world.data()[:, FIELDS.index("total")]
+			draw_sparkline(window, energy, pg.Rect(self.size_x - 210, 10, 200, 50), black)
+
+
+	def start(self):
+		"""Start the simulation"""
+		
+		pg.init()  # Initialize pygame
+		fpsClock = pg.time.Clock()  # Monitor fps
+
+		# Screen parameters :
+		window = pg.display.set_mode((self.size_x, self.size_y))
+
+		pg.display.set_caption("Soft bodies simulator")
+
+		start, new_time = 0., 0.  # Fps monitoring
+		seconds = 0.
+		time_counter = []  # Use mean() to get average frame time
+
+
+		# Font to display fps :
+		font = pg.font.SysFont(None, 24)  # Adjust font side if needed (here : 24 px)
+		img = pg.Surface((0, 0))  # Initialize surface
+
+		try:
+			while True:
+				
+
+				# Get frame beginning time
+				start = time()
+
+				events = []  # Input events of the frame (see handle)
+
+				# Pygame event loop
+				for event in pg.event.get():
+
+					# QUIT events
+					if event.type == pg.QUIT:
+						pg.quit()
+						sys.exit()   
+
+					elif event.type == pg.MOUSEBUTTONDOWN:
+						if event.button == 1:  # left click
+							events.append(("down", *pg.mouse.get_pos()))  # cursor position in pixels
+						
+					elif event.type == pg.MOUSEBUTTONUP:
+						if event.button == 1:  # Left click is released
+							events.append(("up",))
+				 
+
+					elif event.type == pg.KEYDOWN:
+						if event.key == pg.K_ESCAPE:
+							pg.event.post(pg.event.Event(pg.QUIT))
+
+						# Display options : normal vectors, springs, energy sparkline, max available fps
+						elif event.key in Render.KEYS:
+							events.append(("toggle", Render.KEYS[event.key]))
+
+				# Mouse position :
+				pos = pg.mouse.get_pos()  # cursor position in pixels
+				if pos != self.mouse:
+					events.append(("move", *pos))
+
+				for event in events:
+
+					if self.recorder is not None:
+						self.recorder.record(self.frame, event)
+
+					self.handle(event)
+
+					if event == ("toggle", "monitor_fps"):
+						seconds = time()  # Reset time passed
+						time_counter = []  # Reset time counter
+
+				# Process the grabbed point:
+				self.drag(self.cursor())
+
+
+				# Update the objects physics and then render them on the screen
+				self.update()
+
+				self.draw_frame(window)
+
+				# Display available fps
+				if self.monitor_fps:
+					
+					new_time = time()
+					# Update counter
+					time_counter.append(new_time - start)
+
+					if seconds + self.monitor_period < new_time:
+						seconds += self.monitor_period
+
+						# Display fps
+						img = font.render("Available FPS : " + str(int(1/mean(time_counter))), True, black)
+
+						# Reset counter:
+						time_counter = []
+
+					# Each loop : display fps
+					window.blit(img, (0, 0))  # Print the fps in the top left corner
+						
+	 
+				# Update screen and monitor fps   
+				pg.display.update()
+				fpsClock.tick(self.fps)
+				self.frame += 1
+
+		finally:
+			if self.recorder is not None:
+				self.recorder.close(self.frame)
+
+
+class RemoteRender(Render):
+	"""Viewer of a world simulated by another process (see stream.py) :
+
+	draws the objects received by a StreamClient, with the same drawing code as Render,
+	and sends the mouse grabs to the server, which moves the grabbed points
+
+	client : connected StreamClient
+	fps : display frame rate (the server's time step by default)
+	"""
+
+	def __init__(self, client, fps : int=None, scale : int=SCALE):
+
+		client.wait_topology()
+
+		xmin, xmax, ymin, ymax = client.box
+		super().__init__(fps or round(1 / client.dt), int((xmax - xmin) * scale), int((ymax - ymin) * scale), scale)
+
+		self.client = client
+		self.objectList = client.objects  # Updated in place by the client
+
+		self.dragging = False  # Left button down
+		self.sent = None  # Last cursor position sent to the server
+
+		client.start()
+
+
+	def grab(self, mouse_pos : Point):
+		self.client.send_grab(mouse_pos)
+		self.dragging = True
+		self.sent = mouse_pos.pos
+
+
+	def release(self):
+		self.client.send_release()
+		self.dragging = False
+
+
+	def drag(self, mouse_pos : Point):
+		"""Only sends the cursor position when it moves"""
+
+		if self.dragging and np.any(mouse_pos.pos != self.sent):
+			self.client.send_move(mouse_pos)
+			self.sent = mouse_pos.pos
+
+
+	def update(self):
+		"""Applies the last frame received from the server"""
+
+		self.client.update()
@@ -0,0 +1,260 @@
+"""
+scratch.py
+
+Preallocated work arrays for the step pipeline
+
+Each object owns a Scratch : the temporaries of its force, integration and collision computations
+are written into arrays that are allocated at the first step and reused at every following step,
+with the out= argument of the numpy functions. A steady-state step allocates nothing that grows
+with the number of points or springs (see allocations.py).
+
+Scatter replaces np.bincount to sum per-spring values onto their points : the springs attached
+to each point are stored in a padded (slots, n) table, built once per spring topology.
+
+When springs break (see SoftObject.tear_springs), the spring arrays are compacted by swap-remove :
+the Scatter tables and the per-spring cached values are patched spring by spring, and the work arrays
+are shrunk views, so that the cost of a removal does not depend on the number of springs. The cached values
+that depend on the springs attached to each point are then recomputed for the springs attached to the
+points of the removed springs only (see cached).
+"""
+import numpy as np
+from typing import Callable
+
+
+class Scratch:
+	"""Named work arrays and cached values of an object, reused from one step to the next
+
+	The objects are updated by one thread at a time (see World.step) : each object owns its Scratch
+	"""
+
+	def __init__(self):
+
+		self.arrays = {}  # name -> array
+		self.tables = {}  # name -> Scatter
+		self.values = {}  # name -> (key, value)
+		self.spring_values = {}  # spring set name -> names of the cached per-spring arrays of the set
+		self.patches = {}  # name -> function that updates a cached per-spring array after removals (see cached)
+
+
+	def get(self, name : str, shape : tuple, dtype=np.float64) -> np.ndarray:
+		"""Returns the work array called name, (re)allocated if its shape or dtype has changed
+		A shorter array (fewer rows) is a view of the allocated array : removing springs does not reallocate
+		Its content is undefined : it is left over from the previous use
+		"""
+		array = self.arrays.get(name)
+
+		if array is None or array.shape[1:] != shape[1:] or array.dtype != dtype or len(array) < shape[0]:
+			array = self.arrays[name] = np.empty(shape, dtype)
+
+		return array if len(array) == shape[0] else array[:shape[0]]
+
+
+	def scatter(self, name : str, indices : np.ndarray, n : int) -> 'Scatter':
+		"""Returns the Scatter table of the given indices array, rebuilt when the array is replaced
+		(springs added or removed) or when the number of points changes
+		"""
+		table = self.tables.get(name)
+
+		if table is None or table.indices is not indices or table.n != n:
+			table = self.tables[name] = Scatter(indices, n)
+
+		return table
+
+
+	def cached(self, name : str, key : tuple, compute : Callable[[], np.ndarray], springs : str=None,
+		patch : Callable[[np.ndarray, np.ndarray], None]=None) -> np.ndarray:
+		"""Returns the value computed by compute(), recomputed only when key changes
+		(key must not contain arrays : they are compared with ==)
+		springs : name of a spring set, if the value is a per-spring array : it is then compacted
+		with the spring set (see swap_remove)
+		patch(value, points) : if the value also depends on the springs attached to each point, updates in place
+		the values of the springs attached to the given points, once springs of the set have been removed (see compacted)
+		"""
+		value = self.values.get(name)
+
+		if value is None or value[0] != key:
+			value = self.values[name] = (key, compute())
+
+			if springs is not None:
+				self.spring_values.setdefault(springs, set()).add(name)
+				self.patches[name] = patch
+
+		return value[1]
+
+
+	def swap_remove(self, springs : str, spring : int, last : int):
+		"""Patches the Scatter tables (springs + "_i1", springs + "_i2") and the cached per-spring arrays
+		of a spring set, when spring is removed and replaced by spring last (see SpringArray.swap_remove)
+		"""
+		for suffix in ("_i1", "_i2"):
+
+			table = self.tables.get(springs + suffix)
+
+			if table is not None:
+				table.swap_remove(spring, last)
+
+		for name in self.spring_values.get(springs, ()):
+			value = self.values[name][1]
+			value[spring] = value[last]
+
+
+	def compacted(self, springs : str, spring_array, points : np.ndarray):
+		"""Called once the springs of a set have been removed : the Scatter tables are bound to the
+		compacted index arrays of spring_array, and the cached per-spring arrays are shrunk to its length,
+		then patched for the springs attached to points (the points of the removed springs, see cached)
+		"""
+		for suffix, indices in (("_i1", spring_array.i1), ("_i2", spring_array.i2)):
+
+			table = self.tables.get(springs + suffix)
+
+			if table is not None:
+				table.indices = indices
+
+		for name in self.spring_values.get(springs, ()):
+			key, value = self.values[name]
+			self.values[name] = (key, value[:len(spring_array)])
+
+			if self.patches[name] is not None:
+				self.patches[name](value[:len(spring_array)], points)
+
+
+	def clear(self):
+		"""Frees every work array and cached value"""
+
+		self.arrays.clear()
+		self.tables.clear()
+		self.values.clear()
+		self.spring_values.clear()
+		self.patches.clear()
+
+
+class Scatter:
+	"""Sums per-spring values onto the points given by an index array (one point per spring),
+	without allocation : allocation-free np.bincount
+
+	table[s, p] : index of the s-th spring attached to point p (in the springs order),
+	or len(indices) if point p has less than s + 1 springs. The values array given to sum() has
+	a zero row at this index, so the padding adds zeros : the sums are the same as np.bincount's
+
+	Points with many springs (hub points) make the table grow as n * slots : when it would hold
+	more than max_padding entries per spring, np.bincount is used instead (it allocates)
+	"""
+
+	def __init__(self, indices : np.ndarray, n : int, max_padding : float=4.):
+
+		self.indices = indices
+		self.n = n
+		self.shared = False  # True if the arrays belong to a compiled topology (see restore)
+
+		self.count = np.bincount(indices, minlength=n)  # Number of springs attached to each point
+		slots = int(self.count.max()) if len(indices) else 0
+
+		if slots * n > max_padding * len(indices) + n:
+			self.table = None
+			return
+
+		order = np.argsort(indices, kind="stable")
+		points = indices[order]
+
+		# Rank of each spring among the springs attached to the same point
+		rank = np.arange(len(indices)) - (np.cumsum(self.count) - self.count)[points]
+
+		# Padding index : clipped to the zero row of the values when springs are removed
+		self.padding = len(indices)
+
+		self.table = np.full((slots, n), self.padding)
+		self.table[rank, points] = order
+
+		self.slot = np.empty(len(indices), dtype=int)  # Slot of each spring in the table
+		self.slot[order] = rank
+
+
+	def arrays(self) -> dict:
+		"""Returns the arrays of the table (see restore) : count, and table and slot if np.bincount is not used"""
+
+		arrays = {"count" : self.count}
+
+		if self.table is not None:
+			arrays.update(table=self.table, slot=self.slot)
+
+		return arrays
+
+
+	@staticmethod
+	def restore(indices : np.ndarray, n : int, arrays : dict) -> 'Scatter':
+		"""Returns the Scatter of indices from the arrays returned by arrays() (see topology.py)
+		The arrays are shared : they are copied by the first swap_remove (copy on write)
+		"""
+		scatter = Scatter.__new__(Scatter)
+		scatter.indices = indices
+		scatter.n = n
+		scatter.shared = True
+		scatter.count = arrays["count"]
+
+		if "table" in arrays:
+			scatter.padding = len(indices)
+			scatter.table = arrays["table"]
+			scatter.slot = arrays["slot"]
+		else:
+			scatter.table = None
+
+		return scatter
+
+
+	def swap_remove(self, spring : int, last : int):
+		"""Removes spring from the table, then moves spring last to index spring (see SpringArray.swap_remove)
+		self.indices must not have been modified yet
+		"""
+		if self.shared:  # Arrays of a compiled topology
+			self.shared = False
+			self.count = np.array(self.count)
+
+			if self.table is not None:
+				self.table, self.slot = np.array(self.table), np.array(self.slot)
+
+		point = self.indices[spring]
+		self.count[point] -= 1
+
+		if self.table is None:
+			return
+
+		# The last spring of the point's column takes the slot of the removed spring
+		slot, end = self.slot[spring], self.count[point]
+		moved = self.table[end, point]
+		self.table[slot, point] = moved
+		self.slot[moved] = slot
+		self.table[end, point] = self.padding
+
+		if last != spring:
+			self.table[self.slot[last], self.indices[last]] = spring
+			self.slot[spring] = self.slot[last]
+
+
+	def attached(self, points : np.ndarray) -> np.ndarray:
+		"""Returns the indices of the springs attached to the given points (read in their columns of the table)"""
+
+		if self.table is None:
+			return np.flatnonzero(np.isin(self.indices, points))
+
+		springs = self.table[:, points].ravel()
+
+		return springs[springs < len(self.indices)]  # Without the padding
+
+
+	def sum(self, values : np.ndarray, out : np.ndarray, buffer : np.ndarray):
+		"""Sums the (len(indices) + 1, 2) values onto out, a (n, 2) array
+		values[len(indices)] must be zero. buffer : (n, 2) work array
+		"""
+		if self.table is None:
+			for axis in range(out.shape[1]):
+				out[:, axis] = np.bincount(self.indices, values[:-1, axis], self.n)
+
+		elif len(self.table) == 0:
+			out.fill(0.)
+
+		else:
+			np.take(values, self.table[0], axis=0, out=out, mode="clip")
+
+			for slot in self.table[1:]:
+				np.take(values, slot, axis=0, out=buffer, mode="clip")
+				np.add(out, buffer, out=out)
@@ -0,0 +1,152 @@
+"""
+session.py
+
+Recording and replay of interactive sessions
+
+Render.start (see render2D.py) turns the pygame events it handles into input events, applied by Render.handle :
+("down", x, y) left button pressed, ("up",) released, ("move", x, y) cursor moved (pixels, only when it moves),
+("toggle", option) display option toggled by a key. A SessionRecorder writes them with the index of the frame
+they were applied at into a compact log file : gzip-compressed text, a JSON header line (scene, render and world
+parameters), then one "frame kind arguments..." line per event, and a last "frame quit" line.
+
+Replayer drives a Render built from the same parameters with the recorded events, frame by frame, without
+any display : the session is replayed deterministically, and each phase of every frame is timed.
+	python -m softbodies run SCENE --record session.log.gz
+	python -m softbodies replay session.log.gz [--draw]
+"""
+import gzip
+import json
+import numpy as np
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+
+VERSION = 1  # Version of the log format
+
+
+class SessionRecorder:
+	"""Writes the input events of a session into a log file
+
+	path : log file (gzip-compressed text)
+	header : parameters needed to rebuild the session (scene, world options...), stored as JSON
+	"""
+
+	def __init__(self, path : str, header : dict):
+
+		self.file = gzip.open(path, "wt", encoding="ascii")
+		self.file.write(json.dumps(dict(header, version=VERSION)) + "\n")
+
+		self.events = 0  # Number of events written
+
+
+	def record(self, frame : int, event : tuple):
+		"""Writes an input event, applied at the given frame"""
+
+		self.file.write(" ".join(str(value) for value in (frame, *event)) + "\n")
+		self.events += 1
+
+
+	def close(self, frame : int):
+		"""Ends the session at the given frame (which is not computed), and closes the file"""
+
+		if not self.file.closed:
+			self.record(frame, ("quit",))
+			self.file.close()
+
+
+def read_session(path : str) -> Tuple[dict, List[Tuple[int, tuple]]]:
+	"""Returns the header and the (frame, event) list of a session log file"""
+
+	with gzip.open(path, "rt", encoding="ascii") as file:
+
+		header = json.loads(file.readline())
+		if header.get("version") != VERSION:
+			raise ValueError("unsupported session log version : {}".format(header.get("version")))
+
+		events = []
+		for line in file:
+			frame, kind, *arguments = line.split()
+			events.append((int(frame), (kind, *(int(a) if a.lstrip("-").isdigit() else a for a in arguments))))
+
+	return header, events
+
+
+class Replayer:
+	"""Replays a recorded session on a Render, without display, and times each phase of every frame
+
+	render : Render built from the header of the session (same scene, parameters and world options)
+	events : (frame, event) list of the session (see read_session)
+	draw : if True, each frame is also drawn into an off-screen surface (needs pygame)
+
+	Phases : events (input events, point picking), drag (grabbed point), update (physics step), draw
+	"""
+
+	PHASES = ("events", "drag", "update", "draw")
+
+	def __init__(self, render, events : List[Tuple[int, tuple]], draw : bool=False):
+
+		self.render = render
+		self.events = events
+		self.draw = draw
+
+		# Number of frames : the session ends at its "quit" event, or after its last event
+		quit = [frame for frame, event in events if event[0] == "quit"]
+		self.frames = quit[0] if quit else (events[-1][0] + 1 if events else 0)
+
+		self.timings = {phase : np.zeros(self.frames) for phase in Replayer.PHASES}  # (s) per frame
+
+
+	def run(self) -> Dict[str, np.ndarray]:
+		"""Replays the session, returns the duration of each phase of every frame (s)"""
+
+		render = self.render
+		surface = None
+
+		if self.draw:
+			import pygame as pg
+			surface = pg.Surface((render.size_x, render.size_y))  # Off-screen surface
+
+		events = iter(self.events)
+		pending = next(events, None)
+
+		for frame in range(self.frames):
+
+			start = perf_counter()
+
+			while pending is not None and pending[0] <= frame:
+				render.handle(pending[1])
+				pending = next(events, None)
+
+			handled = perf_counter()
+			render.drag(render.cursor())
+
+			dragged = perf_counter()
+			render.update()
+
+			updated = perf_counter()
+			if surface is not None:
+				render.draw_frame(surface)
+
+			drawn = perf_counter()
+
+			for phase, duration in zip(Replayer.PHASES, (handled - start, dragged - handled, updated - dragged, drawn - updated)):
+				self.timings[phase][frame] = duration
+
+		return self.timings
+
+
+	def summary(self) -> str:
+		"""Table of the phase timings : mean, median, 95th percentile and maximum (ms), total (s)"""
+
+		lines = ["{:8} {:>9} {:>9} {:>9} {:>9} {:>9}".format("phase", "mean", "median", "p95", "max", "total")]
+
+		for phase, durations in list(self.timings.items()) + [("frame", sum(self.timings.values()))]:
+
+			if not len(durations) or (phase == "draw" and not self.draw):
+				continue
+
+			lines.append("{:8} {:9.3f} {:9.3f} {:9.3f} {:9.3f} {:9.3f}".format(phase,
+				*(1000 * value for value in (durations.mean(), np.median(durations), np.percentile(durations, 95), durations.max())),
+				durations.sum()))
+
+		return "\n".join(lines)
@@ -0,0 +1,341 @@
+"""
+solvers.py
+
+Physics engines that update the objects of a World over a time step
+
+EulerSolver : force-based engine (springs, pressure, external force fields) and explicit Euler integration
+XPBDSolver : position-based engine (extended position based dynamics), unconditionally stable
+
+"""
+import numpy as np
+
+from .elements import Object, SoftObject, SoftBall, SpringArray, DYNAMIC
+
+
+class EulerSolver:
+	"""Force-based engine :
+	the forces are computed by each object's update() method, then integrated with Euler's method
+
+	Stiff objects need a small time step (high fps) : the k / m ratio cannot exceed a certain value
+	"""
+
+	def step(self, obj : Object, dt : float, bounds : tuple=None):
+		"""Update the physics of an object over a dt time-step
+		The collisions with the container box (bounds) are left to the World
+		"""
+
+		obj.update(dt)
+
+		if isinstance(obj, SoftObject):
+			obj.tear_springs()
+
+
+	@staticmethod
+	def stable_dt(obj : Object) -> float:
+		"""Estimate of the largest stable time step of an object (s), from its springs k / m and kd / m ratios :
+		each dynamic point is an oscillator of stiffness K (sum of the k of its springs) and damping D,
+		which the semi-implicit Euler integration keeps stable if dt < 2 / (sqrt(K / m) + D / m)
+		(the pressure forces of a SoftBall are not taken into account)
+		"""
+		if not isinstance(obj, SoftObject):
+			return np.inf
+
+		n = len(obj.pos)
+		stiffness, damping = np.zeros(n), np.zeros(n)
+
+		for _, springs in obj.spring_sets():
+			for indices in (springs.i1, springs.i2):
+				stiffness += np.bincount(indices, springs.k, n)
+				damping += np.bincount(indices, springs.kd, n)
+
+		dynamic = obj.state == DYNAMIC
+		if not dynamic.any():
+			return np.inf
+
+		rate = np.sqrt(stiffness[dynamic] / obj.m[dynamic]) + damping[dynamic] / obj.m[dynamic]
+
+		return 2 / max(np.max(rate), 1e-12)
+
+
+class XPBDSolver:
+	"""Position-based engine (XPBD : extended position based dynamics)
+
+	Each spring is a compliant distance constraint, and the pressure of a SoftBall is
+	a compliant area constraint. At each iteration, all the springs are projected at once
+	(Jacobi iteration) : the constraint masses of each spring are scaled up by the number of springs
+	attached to its points, so that the summed corrections do not overshoot (the compliances are not scaled :
+	the springs keep their stiffness).
+	XPBD is unconditionally stable : stiff objects can be simulated at 60 fps.
+
+	The objects parameters are reused :
+	k -> compliance 1/k
+	kd -> constraint damping kd
+	pressure_coeff -> area compliance S0² / pressure_coeff (pressure stiffness around the rest surface)
+	pressure_damping_coeff -> damping of the points velocities relative to the barycentre
+
+	substeps : number of substeps per time step (more substeps : stiffer and more accurate)
+	iterations : number of constraint projections per substep
+	relaxation : factor applied to the scaled Jacobi corrections (1 : plain averaging)
+
+	The external force fields of the objects (gravity, see fields.py) are evaluated at each substep
+	"""
+
+	def __init__(self, substeps : int=1, iterations : int=10, relaxation : float=1.):
+
+		self.substeps = substeps
+		self.iterations = iterations
+		self.relaxation = relaxation
+
+
+	@staticmethod
+	def stable_dt(obj : Object) -> float:
+		"""XPBD is unconditionally stable : no time step limit"""
+
+		return np.inf
+
+
+	def step(self, obj : Object, dt : float, bounds : tuple=None):
+		"""Update the physics of an object over a dt time-step
+		bounds : (xmin, xmax, ymin, ymax) container box. The points are kept inside it
+		during the constraint projections, which acts as an inelastic collision
+		"""
+
+		h = dt / self.substeps
+		n = len(obj.pos)
+		scratch = obj.scratch
+		where = obj.where_dynamic()
+
+		# Inverse masses : points that are not dynamic are not moved by the constraints
+		w = scratch.get("xpbd_w", (n,), obj.m.dtype)
+		w.fill(0.)
+		np.divide(1, obj.m, out=w, where=obj.where_dynamic(False))
+
+		# Spring sets (see SoftObject.spring_sets) : each set is projected as a separate batch,
+		# with its own Lagrange multipliers and Jacobi scaling
+		spring_sets = obj.spring_sets() if isinstance(obj, SoftObject) else []
+		batches = []
+
+		for name, springs in spring_sets:
+
+			scatter1, scatter2 = scratch.scatter(name + "_i1", springs.i1, n), scratch.scatter(name + "_i2", springs.i2, n)
+
+			# Jacobi scaling of each spring : relaxation / number of springs of the set attached to its most connected point
+			def jacobi_scale() -> np.ndarray:
+				count = scatter1.count + scatter2.count
+				return self.relaxation / np.maximum(count[springs.i1], count[springs.i2])
+
+			# When springs are torn, only the springs attached to the points of the removed springs are rescaled
+			def patch_scale(scale : np.ndarray, points : np.ndarray, name : str=name):
+				table1, table2 = scratch.tables[name + "_i1"], scratch.tables[name + "_i2"]
+				attached = np.concatenate((table1.attached(points), table2.attached(points)))
+				i1, i2 = table1.indices[attached], table2.indices[attached]
+				scale[attached] = self.relaxation / np.maximum(table1.count[i1] + table2.count[i1], table1.count[i2] + table2.count[i2])
+
+			scale = scratch.cached("xpbd_" + name + "_scale", (scatter1, scatter2, self.relaxation), jacobi_scale,
+				springs=name, patch=patch_scale)
+			spring_lambda = scratch.get("xpbd_" + name + "_lambda", (len(springs),), obj.pos.dtype)
+
+			batches.append((name, springs, scale, spring_lambda))
+
+		prev = scratch.get("xpbd_prev", obj.pos.shape, obj.pos.dtype)
+		displacement = scratch.get("xpbd_displacement", obj.pos.shape, obj.v.dtype)
+
+		for _ in range(self.substeps):
+
+			np.copyto(prev, obj.pos)
+
+			# Predict positions from external forces and velocities
+			obj.reset_forces()
+			obj.field_forces()
+			np.multiply(obj.f, h, out=displacement)
+			np.divide(displacement, obj.m[:, None], out=displacement)
+			np.add(obj.v, displacement, out=obj.v, where=where)
+			np.multiply(obj.v, h, out=displacement, where=where)
+			np.add(obj.pos, displacement, out=obj.pos, where=where)
+			obj.update_kinematic(h)
+
+			# Lagrange multipliers, reset at each substep
+			for _, _, _, spring_lambda in batches:
+				spring_lambda.fill(0.)
+			area_lambda = 0.
+
+			for _ in range(self.iterations):
+
+				for name, springs, scale, spring_lambda in batches:
+					self.project_springs(obj, name, springs, prev, w, scale, h, spring_lambda)
+
+				if isinstance(obj, SoftBall):
+					area_lambda = self.project_area(obj, w, h, area_lambda)
+
+				if bounds is not None:
+					self.project_bounds(obj, bounds)
+
+			# New velocities from the positions change
+			np.subtract(obj.pos, prev, out=obj.v, where=where)
+			np.divide(obj.v, h, out=obj.v, where=where)
+
+			if isinstance(obj, SoftBall):
+				self.pressure_damping(obj, w, h)
+
+		if spring_sets:
+			obj.tear_springs()
+
+
+	@staticmethod
+	def project_springs(obj : SoftObject, name : str, springs : SpringArray, prev : np.ndarray, w : np.ndarray,
+		scale : np.ndarray, h : float, spring_lambda : np.ndarray):
+		"""Projects all the distance constraints of a spring set at once (Jacobi iteration)
+		name : name of the spring set (see SoftObject.spring_sets). spring_lambda is updated in place
+
+		C = length - l0, with compliance 1/k and damping kd.
+		The XPBD update is multiplied by k * h² on both sides, so that springs with k = 0 are handled :
+		dlambda = -(k h² C + lambda + kd h grad(C).dx) / ((k h² + kd h) (w1 + w2) / scale + 1)
+		The Jacobi scale of each spring only divides the constraint masses w1 + w2 : the averaged corrections
+		do not overshoot, and the compliance term is unchanged, so the springs keep their stiffness k
+		"""
+		i1, i2 = springs.i1, springs.i2
+		scratch = obj.scratch
+		n, count = len(obj.pos), len(springs)
+		dtype = obj.pos.dtype
+
+		def get(array : str, columns : int=None) -> np.ndarray:
+			return scratch.get("xpbd_" + name + "_" + array, (count,) if columns is None else (count, columns), dtype)
+
+		pt1 = np.take(obj.pos, i1, axis=0, out=get("pt1", 2), mode="clip")
+		pt2 = np.take(obj.pos, i2, axis=0, out=get("pt2", 2), mode="clip")
+
+		spring_vector = np.subtract(pt2, pt1, out=get("vector", 2))  # from pt1 to pt2
+		squares = np.multiply(spring_vector, spring_vector, out=get("buffer", 2))
+		length = np.add(squares[:, 0], squares[:, 1], out=get("length"))
+		np.sqrt(length, out=length)
+		spring_vector /= np.maximum(length, 1e-12, out=get("denominator"))[:, None]
+
+		C = np.subtract(length, springs.l0, out=length)
+
+		# Relative displacement during the substep, projected on the spring, for damping
+		np.subtract(pt2, np.take(prev, i2, axis=0, out=squares, mode="clip"), out=pt2)
+		np.subtract(pt1, np.take(prev, i1, axis=0, out=squares, mode="clip"), out=pt1)
+		dx = np.subtract(pt2, pt1, out=pt2)
+		np.multiply(dx, spring_vector, out=dx)
+		damping = np.add(dx[:, 0], dx[:, 1], out=get("damping"))
+		damping *= springs.kd
+		damping *= h
+
+		stiffness = np.multiply(springs.k, h**2, out=get("stiffness"))
+
+		# Numerator : -(k h² C + lambda + damping)
+		dlambda = np.multiply(stiffness, C, out=C)
+		dlambda += spring_lambda
+		dlambda += damping
+		np.negative(dlambda, out=dlambda)
+
+		# Denominator : (k h² + kd h) (w1 + w2) / scale + 1
+		denominator = np.multiply(springs.kd, h, out=get("denominator"))
+		np.add(stiffness, denominator, out=denominator)
+		w_sum = np.add(np.take(w, i1, out=damping, mode="clip"), np.take(w, i2, out=stiffness, mode="clip"), out=stiffness)
+		w_sum /= scale
+		denominator *= w_sum
+		denominator += 1
+
+		dlambda /= denominator
+		spring_lambda += dlambda
+
+		# Corrections : pt1 moves along -spring_vector, pt2 along spring_vector
+		# (with a zero row for the padding of the Scatter tables)
+		contributions = scratch.get("xpbd_" + name + "_contributions", (count + 1, 2), dtype)
+		contributions[-1] = 0.
+		np.multiply(spring_vector, dlambda[:, None], out=contributions[:-1])
+
+		correction = scratch.get("xpbd_correction", (n, 2), dtype)
+		total = scratch.get("xpbd_total", (n, 2), dtype)
+		buffer = scratch.get("xpbd_scatter", (n, 2), dtype)
+
+		scratch.scatter(name + "_i2", i2, n).sum(contributions, correction, buffer)
+		scratch.scatter(name + "_i1", i1, n).sum(contributions, total, buffer)
+		np.subtract(correction, total, out=correction)
+
+		correction *= w[:, None]
+		obj.pos += correction
+
+
+	@staticmethod
+	def project_area(obj : SoftBall, w : np.ndarray, h : float, area_lambda : float) -> float:
+		"""Projects the area constraint of a SoftBall, returns the updated Lagrange multiplier
+
+		C = A - A0 with A the signed area, with compliance S0² / pressure_coeff
+		"""
+		scratch = obj.scratch
+		n, dtype = len(obj.edge), obj.pos.dtype
+
+		pos = np.take(obj.pos, obj.edge, axis=0, out=scratch.get("area_pos", (n, 2), dtype), mode="clip")
+
+		following = scratch.get("area_following", (n, 2), dtype)
+		following[:-1] = pos[1:]
+		following[-1] = pos[0]
+
+		previous = scratch.get("area_previous", (n, 2), dtype)
+		previous[1:] = pos[:-1]
+		previous[0] = pos[-1]
+
+		# Signed area (positive if the points are listed in the positive direction of rotation)
+		cross = np.multiply(pos[:, 0], following[:, 1], out=scratch.get("area_cross", (n,), dtype))
+		buffer = np.multiply(following[:, 0], pos[:, 1], out=scratch.get("area_buffer", (n,), dtype))
+		area = np.sum(np.subtract(cross, buffer, out=cross)) / 2
+		rest_area = np.copysign(obj.S0, area)
+
+		# Gradient of the area for each point
+		grad = scratch.get("area_gradient", (n, 2), dtype)
+		np.subtract(following[:, 1], previous[:, 1], out=grad[:, 0])
+		np.subtract(previous[:, 0], following[:, 0], out=grad[:, 1])
+		grad /= 2
+
+		stiffness = obj.pressure_coeff / obj.S0**2 * h**2
+		we = np.take(w, obj.edge, out=scratch.get("area_w", (n,), w.dtype), mode="clip")
+
+		squares = np.multiply(grad, grad, out=previous)
+		weighted = np.add(squares[:, 0], squares[:, 1], out=cross)
+		weighted *= we
+
+		dlambda = -(stiffness * (area - rest_area) + area_lambda) / (stiffness * np.sum(weighted) + 1)
+
+		np.multiply(we, dlambda, out=buffer)
+		grad *= buffer[:, None]
+		pos += grad
+		obj.pos[obj.edge] = pos
+
+		return area_lambda + dlambda
+
+
+	@staticmethod
+	def project_bounds(obj : Object, bounds : tuple):
+		"""Moves the dynamic points that are out of the container box back onto its walls"""
+
+		xmin, xmax, ymin, ymax = bounds
+
+		np.clip(obj.pos, (xmin, ymin), (xmax, ymax), out=obj.pos, where=obj.where_dynamic())
+
+
+	@staticmethod
+	def pressure_damping(obj : SoftBall, w : np.ndarray, h : float):
+		"""Damps the velocity of each point relative to the barycentre, along the barycentre -> point direction"""
+
+		barycentre = obj.barycentre()
+		scratch = obj.scratch
+		n, dtype = len(obj.pos), obj.pos.dtype
+
+		vector = np.subtract(obj.pos, barycentre.pos, out=scratch.get("damping_vector", (n, 2), dtype))
+		buffer = np.multiply(vector, vector, out=scratch.get("damping_buffer", (n, 2), dtype))
+		length = np.add(buffer[:, 0], buffer[:, 1], out=scratch.get("damping_force", (n,), dtype))
+		np.sqrt(length, out=length)
+		vector /= np.maximum(length, 1e-12, out=length)[:, None]
+
+		np.subtract(obj.v, barycentre.v, out=buffer)
+		np.multiply(vector, buffer, out=buffer)
+		rel_velocity = np.add(buffer[:, 0], buffer[:, 1], out=length)
+
+		# Implicit damping : the relative velocity cannot be reversed
+		factor = np.multiply(w, obj.pressure_damp * h, out=scratch.get("damping_factor", (n,), w.dtype))
+		np.minimum(factor, 1., out=factor)
+
+		rel_velocity *= factor
+		obj.v -= np.multiply(rel_velocity[:, None], vector, out=vector)
@@ -0,0 +1,562 @@
+"""
+stream.py
+
+Remote viewer : streams the objects of a World over a TCP socket, and receives the mouse grabs back
+
+The server publishes the topology of the objects (number of points, edge, springs), then one message
+per frame with the positions of every point. The positions are quantized (1 mm steps by default), and each
+frame is encoded against the last frames received by the client : the residual of a constant velocity
+prediction (q - 2 q1 + q2), in the smallest integer type that holds it, x then y, compressed with zlib.
+Resting points and points moving at constant velocity cost almost nothing :
+a 50000 points net needs about 400 kB/s at 60 fps.
+
+Each client has its own encoder : a client that is too slow to receive every frame skips some of them,
+and the next frames are encoded against the last frames it did receive. The quantization error does not
+accumulate : it is at most quantum / 2 on every frame.
+
+Messages : header (kind : 4 bytes, payload length : uint32), then the payload
+TOPO : npz archive of the topology : box, quantum, and for each object its number of points, edge and springs
+FRAM : frame index (uint32), prediction order (uint8 : 0 absolute positions, 1 delta, 2 constant velocity),
+	residual item size (uint8), then the zlib compressed residuals
+GRAB, MOVE : cursor position (2 float64, in m) ; RELS : empty
+Clients only send GRAB, MOVE and RELS
+
+Does not depend on pygame : the viewer is render2D.RemoteRender
+	python -m softbodies serve SCENE --port 8765
+	python -m softbodies view localhost:8765
+"""
+import io
+import zlib
+import queue
+import socket
+import struct
+import threading
+import numpy as np
+from time import perf_counter, sleep
+from typing import List, Tuple
+
+from .elements import Point, Object, SoftObject, SpringArray
+from .world import World
+
+
+HEADER = struct.Struct("<4sI")  # kind, payload length
+FRAME = struct.Struct("<IBB")  # frame index, prediction order, residual item size
+CURSOR = struct.Struct("<dd")  # x, y (m)
+
+QUANTUM = 1e-3  # (m) default quantization step of the positions
+
+
+def message(kind : bytes, payload : bytes=b"") -> bytes:
+	return HEADER.pack(kind, len(payload)) + payload
+
+
+def receive_exactly(sock : socket.socket, size : int) -> bytes:
+	"""Returns the next size bytes received, or None if the connection is closed"""
+
+	data = bytearray()
+
+	while len(data) < size:
+		chunk = sock.recv(size - len(data))
+		if not chunk:
+			return None
+		data += chunk
+
+	return bytes(data)
+
+
+def receive_message(sock : socket.socket) -> Tuple[bytes, bytes]:
+	"""Returns the next (kind, payload) message, or (None, None) if the connection is closed"""
+
+	header = receive_exactly(sock, HEADER.size)
+	if header is None:
+		return None, None
+
+	kind, length = HEADER.unpack(header)
+	payload = receive_exactly(sock, length)
+
+	return (kind, payload) if payload is not None else (None, None)
+
+
+def encode_topology(world : World, quantum : float) -> bytes:
+	"""npz archive of the topology of the world's objects"""
+
+	arrays = {
+		"box" : np.array([world.xmin, world.xmax, world.ymin, world.ymax]),
+		"quantum" : np.array(quantum),
+		"dt" : np.array(world.dt),
+		"points" : np.array([len(obj.pos) for obj in world.objectList], dtype=np.int64),
+		"torn" : np.array([isinstance(obj, SoftObject) and obj.torn for obj in world.objectList], dtype=bool),
+	}
+
+	for k, obj in enumerate(world.objectList):
+
+		springs = obj.springs if isinstance(obj, SoftObject) else SpringArray()
+
+		arrays["edge_{}".format(k)] = obj.edge
+		arrays["i1_{}".format(k)] = springs.i1
+		arrays["i2_{}".format(k)] = springs.i2
+
+	buffer = io.BytesIO()
+	np.savez_compressed(buffer, **arrays)
+
+	return buffer.getvalue()
+
+
+class FrameEncoder:
+	"""Encodes the quantized positions of successive frames against the last two encoded frames"""
+
+	def __init__(self, level : int=1):
+
+		self.level = level  # zlib compression level
+		self.history = []  # Last encoded frames, most recent first
+
+	def reset(self):
+		"""The next frame is encoded with absolute positions (new client, or new topology)"""
+		self.history = []
+
+	def encode(self, q : np.ndarray, index : int) -> bytes:
+		"""q : (n, 2) int64 quantized positions"""
+
+		order = len(self.history)
+		residual = q if order == 0 else q - self.history[0] if order == 1 else q - 2 * self.history[0] + self.history[1]
+
+		peak = np.abs(residual).max() if len(residual) else 0
+		dtype = next(t for t in (np.int8, np.int16, np.int32, np.int64) if peak <= np.iinfo(t).max)
+
+		self.history = [q, *self.history[:1]]
+
+		# x then y : the coordinates of neighbour points are close, they compress better together
+		data = np.ascontiguousarray(residual.T, dtype=dtype).tobytes()
+
+		return FRAME.pack(index, order, np.dtype(dtype).itemsize) + zlib.compress(data, self.level)
+
+
+class FrameDecoder:
+	"""Decodes the frames of a FrameEncoder"""
+
+	def __init__(self):
+		self.history = []
+
+	def reset(self):
+		self.history = []
+
+	def decode(self, payload : bytes) -> Tuple[int, np.ndarray]:
+		"""Returns the (frame index, (n, 2) int64 quantized positions) of a FRAM payload"""
+
+		index, order, itemsize = FRAME.unpack_from(payload)
+		dtype = {1 : np.int8, 2 : np.int16, 4 : np.int32, 8 : np.int64}[itemsize]
+
+		residual = np.frombuffer(zlib.decompress(payload[FRAME.size:]), dtype).reshape(2, -1).T.astype(np.int64)
+
+		if order == 0:
+			q = residual
+		elif order == 1:
+			q = residual + self.history[0]
+		else:
+			q = residual + 2 * self.history[0] - self.history[1]
+
+		self.history = [q, *self.history[:1]]
+
+		return index, q
+
+
+class Connection:
+	"""A client of a StreamServer : its socket, encoder, send queue and grab state
+
+	The messages are sent by a thread, from a bounded queue : the server skips frames when the queue is full
+	"""
+
+	def __init__(self, server : 'StreamServer', sock : socket.socket, maxsize : int):
+
+		self.server = server
+		self.socket = sock
+		self.encoder = FrameEncoder(server.level)
+		self.queue = queue.Queue(maxsize)
+		self.topology = None  # Topology (of the server) last sent to the client
+		self.closed = False
+
+		self.grabbed_object : Object = None
+		self.mouse = Point(0, 0)  # Last cursor position
+
+		self.sender = threading.Thread(target=self.send_loop, daemon=True)
+		self.receiver = threading.Thread(target=self.receive_loop, daemon=True)
+		self.sender.start()
+		self.receiver.start()
+
+
+	def send_loop(self):
+
+		while True:
+			data = self.queue.get()
+			if data is None:
+				break
+
+			try:
+				self.socket.sendall(data)
+			except OSError:
+				break
+
+		self.closed = True
+
+
+	def receive_loop(self):
+		"""Forwards the events of the client to the server"""
+
+		while True:
+			try:
+				kind, payload = receive_message(self.socket)
+			except OSError:
+				kind = None
+
+			if kind is None:
+				break
+
+			self.server.events.put((self, kind, payload))
+
+		self.closed = True
+
+
+	def close(self):
+
+		self.closed = True
+
+		try:
+			self.queue.put_nowait(None)  # Stops the sender (or its next send fails)
+		except queue.Full:
+			pass
+
+		try:
+			self.socket.shutdown(socket.SHUT_RDWR)
+		except OSError:
+			pass
+
+		self.socket.close()
+
+
+class StreamServer:
+	"""Publishes the objects of a world to the connected clients, and applies their mouse grabs
+
+	world : the published World
+	host, port : listening address (port 0 : any free port, see self.address)
+	quantum : (m) quantization step of the positions
+	maxsize : number of messages queued per client, before frames are skipped
+	level : zlib compression level
+
+	Call publish() after each step (or use run()), and apply_events() before each step
+	"""
+
+	def __init__(self, world : World, host : str="127.0.0.1", port : int=0, quantum : float=QUANTUM,
+		maxsize : int=4, level : int=1):
+
+		self.world = world
+		self.quantum = quantum
+		self.maxsize = maxsize
+		self.level = level
+
+		self.frame = 0  # Index of the next published frame
+
+		self.clients : List[Connection] = []
+		self.lock = threading.Lock()  # Protects self.clients
+		self.events = queue.Queue()  # (connection, kind, payload) events received from the clients
+
+		self.topology = None  # Objects and topology arrays of the last published topology (see signature)
+		self.topology_message = None
+
+		self.listener = socket.create_server((host, port))
+		self.address = self.listener.getsockname()[:2]
+
+		threading.Thread(target=self.accept_loop, daemon=True).start()
+
+
+	def accept_loop(self):
+
+		while True:
+			try:
+				sock, _ = self.listener.accept()
+			except OSError:  # Closed listener
+				return
+
+			sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+			with self.lock:
+				self.clients.append(Connection(self, sock, self.maxsize))
+
+
+	def signature(self) -> list:
+		"""Identifies the topology : the objects, and their position, edge and spring arrays
+		(the arrays are replaced when points or springs are added or removed)
+		"""
+		signature = []
+
+		for obj in self.world.objectList:
+			signature += [obj, obj.pos, obj.edge]
+			signature += [obj.springs.i1, obj.springs.i2] if isinstance(obj, SoftObject) else [None, None]
+
+		return signature
+
+
+	def publish(self):
+		"""Sends the current positions to every client (and the topology, if it has changed)"""
+
+		signature = self.signature()
+
+		if self.topology is None or len(signature) != len(self.topology) or \
+			any(new is not old for new, old in zip(signature, self.topology)):
+
+			self.topology = signature
+			self.topology_message = message(b"TOPO", encode_topology(self.world, self.quantum))
+
+		with self.lock:
+			for client in [c for c in self.clients if c.closed]:
+				self.disconnect(client)
+			clients = list(self.clients)
+
+		if clients:
+			positions = [obj.pos for obj in self.world.objectList]
+			q = np.rint(np.concatenate(positions) / self.quantum).astype(np.int64) if positions else np.zeros((0, 2), np.int64)
+
+		for client in clients:
+
+			# Skipped frame : the client is too slow. The encoder only follows the frames that are sent
+			if client.queue.full():
+				continue
+
+			data = b""
+			if client.topology is not self.topology:
+				data = self.topology_message
+				client.topology = self.topology
+				client.encoder.reset()
+
+			try:
+				client.queue.put_nowait(data + message(b"FRAM", client.encoder.encode(q, self.frame)))
+			except queue.Full:  # Closing client
+				pass
+
+		self.frame += 1
+
+
+	def apply_events(self):
+		"""Applies the mouse events received from the clients, then moves their grabbed points"""
+
+		while True:
+			try:
+				client, kind, payload = self.events.get_nowait()
+			except queue.Empty:
+				break
+
+			if kind in (b"GRAB", b"MOVE"):
+				client.mouse = Point(*CURSOR.unpack(payload))
+
+			if kind == b"GRAB":
+				self.release(client)
+
+				picked = self.world.picking.nearest(client.mouse)
+				if picked is not None:
+					client.grabbed_object, i = picked
+					client.grabbed_object.grabPoint(i)
+
+			elif kind == b"RELS":
+				self.release(client)
+
+		with self.lock:
+			clients = list(self.clients)
+
+		for client in clients:
+			if client.grabbed_object is not None:
+				client.grabbed_object.computeGrabbedPoint(client.mouse, self.world.dt)
+
+
+	@staticmethod
+	def release(client : Connection):
+
+		if client.grabbed_object is not None:
+			client.grabbed_object.releaseGrabbedPoint()
+			client.grabbed_object = None
+
+
+	def disconnect(self, client : Connection):
+		"""Removes a client (self.lock must be held)"""
+
+		self.release(client)
+		client.close()
+		self.clients.remove(client)
+
+
+	def run(self, frames : int=None, steps_per_frame : int=1, realtime : bool=True):
+		"""Simulates and publishes frames (forever if frames is None)
+		realtime : the frames are paced at the simulated time (steps_per_frame * dt per frame)
+		"""
+		period = self.world.dt * steps_per_frame
+		deadline = perf_counter()
+		count = 0
+
+		while frames is None or count < frames:
+
+			self.apply_events()
+
+			for _ in range(steps_per_frame):
+				self.world.step()
+
+			self.publish()
+			count += 1
+
+			if realtime:
+				deadline += period
+				sleep(max(0., deadline - perf_counter()))
+
+
+	def close(self):
+		"""Stops listening and disconnects every client"""
+
+		self.listener.close()
+
+		with self.lock:
+			for client in list(self.clients):
+				self.disconnect(client)
+
+
+class StreamClient:
+	"""Receives the objects published by a StreamServer
+
+	objects : objects rebuilt from the topology (positions, edge, springs). The list is modified in place
+	when the topology changes
+
+	receive() receives and decodes the next message, update() then applies the last received topology
+	and frame to the objects. start() calls receive() in a background thread
+	"""
+
+	def __init__(self, host : str="127.0.0.1", port : int=8765):
+
+		self.socket = socket.create_connection((host, port))
+		self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+		self.decoder = FrameDecoder()
+		self.objects : List[Object] = []
+		self.offsets = np.zeros(1, dtype=np.int64)  # First point of each object in the frames
+
+		self.box = None  # (xmin, xmax, ymin, ymax)
+		self.quantum = QUANTUM
+		self.dt = None
+
+		self.frame = None  # Index of the last received frame
+		self.frames = 0  # Number of received frames
+		self.received = 0  # Number of received bytes
+
+		# Received, not applied yet (see update)
+		self.lock = threading.Lock()
+		self.topology = None
+		self.positions = None
+
+		self.thread = None
+
+
+	def receive(self) -> bytes:
+		"""Receives and decodes the next message. Returns its kind, or None if the server is gone"""
+
+		try:
+			kind, payload = receive_message(self.socket)
+		except OSError:
+			kind = None
+
+		if kind is None:
+			return None
+
+		if kind == b"TOPO":
+			topology = np.load(io.BytesIO(payload))
+			self.decoder.reset()
+
+			with self.lock:
+				self.topology, self.positions = topology, None
+
+		elif kind == b"FRAM":
+			index, q = self.decoder.decode(payload)
+
+			with self.lock:
+				self.frame = index
+				self.positions = q
+
+		self.frames += kind == b"FRAM"
+		self.received += HEADER.size + len(payload)
+
+		return kind
+
+
+	def update(self) -> bool:
+		"""Applies the last received topology and frame to the objects.
+		Returns False if nothing was received since the last update
+		"""
+		with self.lock:
+			topology, positions = self.topology, self.positions
+			self.topology = self.positions = None
+
+		if topology is not None:
+			self.set_topology(topology)
+
+		if positions is not None:
+			positions = positions * self.quantum
+
+			for obj, start, end in zip(self.objects, self.offsets[:-1], self.offsets[1:]):
+				obj.pos[:] = positions[start:end]
+
+		return topology is not None or positions is not None
+
+
+	def set_topology(self, archive):
+
+		self.box = tuple(archive["box"])
+		self.quantum = float(archive["quantum"])
+		self.dt = float(archive["dt"])
+
+		points = archive["points"]
+		self.offsets = np.concatenate(([0], np.cumsum(points)))
+
+		self.objects[:] = [
+			SoftObject(np.zeros((n, 2)), np.ones(n),
+				SpringArray(archive["i1_{}".format(k)], archive["i2_{}".format(k)]), archive["edge_{}".format(k)])
+			for k, n in enumerate(points)
+		]
+
+		for obj, torn in zip(self.objects, archive["torn"]):
+			obj.torn = bool(torn)
+
+
+	def wait_topology(self):
+		"""Receives messages until the topology is known, and applies it"""
+
+		while self.box is None:
+			if self.receive() is None:
+				raise ConnectionError("stream closed before the topology was received")
+			self.update()
+
+
+	def start(self):
+		"""Receives the messages in a background thread, until the connection is closed"""
+
+		self.thread = threading.Thread(target=self.receive_loop, daemon=True)
+		self.thread.start()
+
+
+	def receive_loop(self):
+
+		while self.receive() is not None:
+			pass
+
+
+	def send_grab(self, mouse : Point):
+		self.socket.sendall(message(b"GRAB", CURSOR.pack(mouse.x, mouse.y)))
+
+	def send_move(self, mouse : Point):
+		self.socket.sendall(message(b"MOVE", CURSOR.pack(mouse.x, mouse.y)))
+
+	def send_release(self):
+		self.socket.sendall(message(b"RELS"))
+
+
+	def close(self):
+
+		try:
+			self.socket.shutdown(socket.SHUT_RDWR)
+		except OSError:
+			pass
+
+		self.socket.close()
@@ -0,0 +1,138 @@
+"""
+topology.py
+
+Compiled topology cache
+
+Building a large SpringyStructure or NetObject computes its rest positions, spring index arrays,
+rest lengths, edge and pinned points, then the Scatter tables of its springs at the first step
+(see scratch.py). Parameter sweeps rebuild the same geometry many times : the compiled topology is
+stored in a cache, content-addressed by the geometric parameters of the constructor, so that the
+following builds only copy arrays.
+
+The entries are held in memory, least recently used first evicted over a size budget, and
+optionally stored on disk as .npy files (one directory per entry), loaded as copy-on-write memory maps.
+The cached arrays are shared and must not be modified : the objects copy the arrays they modify in place.
+(they are not flagged read-only : numpy copies read-only index arrays at each np.take)
+
+Usage :
+	from softbodies.topology import TOPOLOGY_CACHE
+	TOPOLOGY_CACHE.directory = "topologies"  # Also store the entries on disk, shared between runs
+"""
+import os
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict
+
+
+VERSION = 1  # Version of the compiled arrays : changes the keys when the builders change
+
+
+class TopologyCache:
+	"""Cache of compiled topologies : dictionaries of named arrays, keyed by the parameters they are built from
+
+	max_bytes : size budget of the entries held in memory (least recently used entries are evicted)
+	directory : directory of the entries stored on disk (None : memory only)
+	"""
+
+	def __init__(self, max_bytes : int=256 * 2**20, directory : str=None):
+
+		self.max_bytes = max_bytes
+		self.directory = directory
+
+		self.entries : Dict[str, Dict[str, np.ndarray]] = OrderedDict()  # key -> arrays, most recently used last
+		self.bytes = 0
+
+		self.hits = self.misses = 0
+
+
+	@staticmethod
+	def key(params : tuple) -> str:
+		"""Content address of an entry : hash of the parameters (numbers, strings, booleans)"""
+
+		return hashlib.sha1(repr((VERSION,) + tuple(params)).encode()).hexdigest()
+
+
+	def get(self, params : tuple, build : Callable[[], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+		"""Returns the shared arrays of the entry of params : from memory, from disk, or built with build()"""
+
+		key = TopologyCache.key(params)
+		arrays = self.entries.get(key)
+
+		if arrays is not None:
+			self.entries.move_to_end(key)
+			self.hits += 1
+			return arrays
+
+		arrays = self.load(key) if self.directory is not None else None
+
+		if arrays is None:
+			self.misses += 1
+			arrays = build()
+
+			if self.directory is not None:
+				self.save(key, arrays)
+		else:
+			self.hits += 1
+
+		self.insert(key, arrays)
+
+		return arrays
+
+
+	def insert(self, key : str, arrays : Dict[str, np.ndarray]):
+		"""Holds an entry in memory, and evicts the least recently used entries over the size budget"""
+
+		self.entries[key] = arrays
+		self.bytes += sum(array.nbytes for array in arrays.values())
+
+		while self.bytes > self.max_bytes and len(self.entries) > 1:
+			_, evicted = self.entries.popitem(last=False)
+			self.bytes -= sum(array.nbytes for array in evicted.values())
+
+
+	def load(self, key : str) -> Dict[str, np.ndarray]:
+		"""Returns the memory-mapped arrays of an entry stored on disk, None if there is none
+		(copy-on-write mapping : the file is never modified)
+		"""
+
+		path = os.path.join(self.directory, key)
+
+		if not os.path.isdir(path):
+			return None
+
+		return {
+			name[:-4] : np.load(os.path.join(path, name), mmap_mode="c")
+			for name in os.listdir(path) if name.endswith(".npy")
+		}
+
+
+	def save(self, key : str, arrays : Dict[str, np.ndarray]):
+		"""Stores an entry on disk. The entry is written into a temporary directory, then renamed :
+		concurrent runs never load a partial entry
+		"""
+		path = os.path.join(self.directory, key)
+		temporary = "{}.{}.tmp".format(path, os.getpid())
+
+		os.makedirs(temporary, exist_ok=True)
+
+		for name, array in arrays.items():
+			np.save(os.path.join(temporary, name + ".npy"), array)
+
+		try:
+			os.rename(temporary, path)
+
+		except OSError:  # Stored by another run in the meantime
+			for name in os.listdir(temporary):
+				os.remove(os.path.join(temporary, name))
+			os.rmdir(temporary)
+
+
+	def clear(self):
+		"""Empties the memory (the entries stored on disk are kept)"""
+
+		self.entries.clear()
+		self.bytes = 0
+
+
+TOPOLOGY_CACHE = TopologyCache()  # Cache used by the objects constructors
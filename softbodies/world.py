@@ -0,0 +1,197 @@
+"""
+world.py
+
+Physics world : the objects, the box that contains them, and the engine used to update them
+Does not depend on pygame : can be used for simulations without display
+"""
+import numpy as np
+from typing import List
+
+from .elements import Object
+from .fields import ForceField, Gravity
+from .solvers import EulerSolver
+from .picking import PickingIndex
+
+
+class World:
+	"""World class :
+
+	Contains the simulated objects and updates their physics at each step
+
+	dt : simulation time step (s)
+	xmin, xmax, ymin, ymax : container box boundaries (m)
+	solver : engine used to update the objects (EulerSolver by default, XPBDSolver, or DomainSolver for
+	very large objects, see domains.py)
+	workers : number of threads used to update the objects in parallel (1 : serial)
+	dtype : precision of the objects state and spring parameters (np.float64, or np.float32 for large scenes)
+	force_dtype : precision of the force accumulation (dtype by default, np.float64 for stability in float32 mode)
+	fields : external force fields applied to every object (see fields.py), [Gravity()] by default
+	continuous_collision : if True, the collisions with the container box are swept (see
+	Object.compute_swept_box_collision) : points that cross a wall bounce from their time of impact,
+	which keeps large time steps correct. Otherwise, they are moved back onto the wall
+	restitution : ratio of the normal velocities after and before a swept collision
+	multirate : if True, each added object whose substeps attribute is None gets the number of substeps
+	its stiffness needs (see EulerSolver.stable_dt)
+
+	Multi-rate integration : each object is updated obj.substeps times per step, over dt / obj.substeps
+	(stiff objects are updated more often than soft ones). The collisions with the container box are computed
+	after each substep, and the objects are synchronized at the end of each step.
+
+	Parallel step : the objects are partitioned into one contiguous chunk per worker, and each chunk
+	is updated by a thread (the large numpy kernels release the GIL). The collisions are then computed
+	serially. Objects do not interact during the update phase : the results do not depend on the
+	number of workers. Kinematic trajectory callbacks are then called from the worker threads.
+	"""
+
+	def __init__(self, dt : float, xmin : float=0., xmax : float=6.4, ymin : float=0., ymax : float=4.8, solver=None,
+		workers : int=1, dtype=np.float64, force_dtype=None, fields : List[ForceField]=None, multirate : bool=False,
+		continuous_collision : bool=False, restitution : float=1.):
+
+		self.dt = dt
+
+		# Container box boundaries
+		self.xmin, self.xmax = xmin, xmax
+		self.ymin, self.ymax = ymin, ymax
+
+		self.solver = solver or EulerSolver()
+
+		self.objectList : List[Object] = []  # Empty object list
+
+		# External force fields, shared by every object : each field is evaluated once per object and per step
+		self.fields : List[ForceField] = [Gravity()] if fields is None else list(fields)
+
+		self.steps = 0  # Number of steps computed
+
+		# Precision of the objects arrays
+		self.dtype = dtype
+		self.force_dtype = force_dtype
+
+		self.multirate = multirate
+
+		# Collisions with the container box
+		self.continuous_collision = continuous_collision
+		self.restitution = restitution
+
+		self.workers = workers
+		self.pool = None  # Thread pool, created at the first parallel step
+
+		self.diagnostics = None  # Optional Diagnostics recorder (see diagnostics.py), updated after each step
+
+		# Index of all the points, for nearest point and radius queries (see picking.py)
+		self.picking = PickingIndex(self)
+
+
+	def setWorkers(self, workers : int):
+		"""Set the number of threads used to update the objects (1 : serial)"""
+
+		if self.pool is not None:
+			self.pool.shutdown()
+			self.pool = None
+
+		self.workers = workers
+
+
+	def close(self):
+		"""Shut down the worker threads, if any, and the worker processes of the solver (see DomainSolver)"""
+
+		self.setWorkers(self.workers)
+
+		if hasattr(self.solver, "close"):
+			self.solver.close()
+
+
+	def addObject(self, object : Object):
+		"""Add an object before starting simulation, converted to the world's precision"""
+
+		object.setPrecision(self.dtype, self.force_dtype)
+		object.fields = self.fields
+
+		if self.multirate and object.substeps is None:
+			object.substeps = self.stable_substeps(object)
+
+		self.objectList.append(object)
+
+
+	def stable_substeps(self, object : Object, safety : float=0.5) -> int:
+		"""Number of substeps for which the solver is stable on the object, with a safety factor on the time step"""
+
+		return max(1, int(np.ceil(self.dt / (safety * self.solver.stable_dt(object)))))
+
+
+	def addField(self, field : ForceField):
+		"""Add an external force field (see fields.py), applied to every object from the next step"""
+
+		self.fields.append(field)
+
+
+	def removeField(self, field : ForceField):
+		"""Remove an external force field"""
+
+		self.fields.remove(field)
+
+
+	def step(self):
+		"""Update the objects physics over a dt time step, then compute the collisions with the container box"""
+
+		if self.workers > 1 and len(self.objectList) > 1:
+
+			if self.pool is None:
+				from concurrent.futures import ThreadPoolExecutor  # Only loaded for parallel steps
+
+				self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix="world")
+
+			# Wait for every chunk, and raise the exceptions of the workers if any
+			for _ in self.pool.map(self.update_objects, self.partition()):
+				pass
+		else:
+			self.update_objects(self.objectList)
+
+		# Serial collision phase
+		for obj in self.objectList:
+
+			self.collide(obj, self.dt / (obj.substeps or 1))
+
+		self.steps += 1
+
+		if self.diagnostics is not None:
+			self.diagnostics.update(self)
+
+
+	def update_objects(self, objects : List[Object]):
+		"""Update the physics of the given objects over a dt time step"""
+
+		bounds = (self.xmin, self.xmax, self.ymin, self.ymax)
+
+		for obj in objects:
+
+			substeps = obj.substeps or 1
+
+			for substep in range(substeps):
+				self.solver.step(obj, self.dt / substeps, bounds)
+
+				# The collisions with the container box only concern the object : they are computed at each substep,
+				# the last one by the collision phase of step()
+				if substep < substeps - 1:
+					self.collide(obj, self.dt / substeps)
+
+
+	def collide(self, obj : Object, dt : float):
+		"""Computes the collisions of an object with the container box, after a dt (sub)step"""
+
+		if self.continuous_collision:
+			obj.compute_swept_box_collision(self.xmin, self.xmax, self.ymin, self.ymax, dt, self.restitution)
+		else:
+			obj.compute_container_box_collision(self.xmin, self.xmax, self.ymin, self.ymax)
+
+
+	def partition(self) -> List[List[Object]]:
+		"""Split the object list into one contiguous chunk per worker,
+		with approximately the same number of points and springs (times the substeps) in each chunk
+		"""
+		costs = np.cumsum([(len(obj.pos) + len(getattr(obj, 'springs', ()))) * (obj.substeps or 1) for obj in self.objectList])
+
+		# Index of the first object of each chunk
+		bounds = np.searchsorted(costs, costs[-1] * np.arange(1, self.workers) / self.workers)
+		bounds = [0, *bounds, len(self.objectList)]
+
+		return [self.objectList[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]